@@ -83,7 +83,8 @@ def process_calibration_frame(frame):
     
     if roi.size > 0:  # Make sure ROI is not empty
         # Convert to HSV for skin color analysis
-        hsv_roi = cv2.cvtColor(roi, cv2.COLOR_RGB2HSV)
+        _import_modules()
+        hsv_roi = cv2.cvtColor(roi, hand_detection_module.get_color_conversion("hsv"))
         
         # Add current sample to collection
         calibration_samples.append(hsv_roi)
@@ -167,7 +168,8 @@ def process_manual_calibration_frame(frame):
     temp_upper_skin = np.array([manual_max_h, manual_max_s, manual_max_v], dtype=np.uint8)
     
     # Convert to HSV for skin detection
-    hsv = cv2.cvtColor(frame, cv2.COLOR_RGB2HSV)
+    _import_modules()
+    hsv = cv2.cvtColor(frame, hand_detection_module.get_color_conversion("hsv"))
     
     # Create mask for skin color
     mask = cv2.inRange(hsv, temp_lower_skin, temp_upper_skin)
@@ -209,12 +211,12 @@ def draw_manual_calibration_controls(screen, calibration_area):
     slider_left = calibration_area.left + 40
     
     # Title
-    font = pygame.font.SysFont('Arial', 16, bold=True)
+    font = config.get_font('Arial', 16, bold=True)
     title = font.render("Manual Skin Color Calibration", True, config.BLACK)
     screen.blit(title, (calibration_area.centerx - title.get_width()//2, calibration_area.top + 15))
     
     # Instructions
-    instructions_font = pygame.font.SysFont('Arial', 14)
+    instructions_font = config.get_font('Arial', 14)
     instructions = [
         "Adjust the sliders to set the HSV range",
         "for skin color detection.",
@@ -277,7 +279,7 @@ def draw_manual_calibration_controls(screen, calibration_area):
 
 def draw_slider_pair(screen, label, x, y, width, max_value, min_val, max_val, min_id, max_id):
     """Helper function to draw a pair of min/max sliders with labels"""
-    font = pygame.font.SysFont('Arial', 14)
+    font = config.get_font('Arial', 14)
     
     # Draw label
     label_text = font.render(label, True, config.BLACK)
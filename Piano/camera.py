@@ -1,18 +1,27 @@
 #!/usr/bin/env python3
 # camera.py - Handles camera initialization and operations
 
+import os
 import cv2
+import json
 import time
 import numpy as np
 import pygame
-from threading import Thread
+from threading import Thread, Condition
+from concurrent.futures import ThreadPoolExecutor
 import config
+import frame_sources
+import frame_pipeline
+import detection_pool
+import motion_gate
+import quality_governor
+import hand_tracker
+import overlay
+import fingertip_notes
 from terminal import add_terminal_message
 
-# Global camera objects
-camera = None
-camera_frame = None
-camera_surface = None
+# Cameras of the current session (the first one is the primary camera)
+cameras = []
 
 # Import these modules only when needed to avoid circular imports
 hand_detection_module = None
@@ -28,193 +37,708 @@ def _import_modules():
         import calibration
         calibration_module = calibration
 
-def initialize_camera():
-    """Initialize the camera device - This doesn't get called until Begin button is clicked"""
-    global camera
+def _open_camera(camera_index, backend=None, width=None, height=None):
+    """Open a camera and read a test frame, returning (capture, frame) or (None, None)"""
+    api = getattr(cv2, f"CAP_{backend}", cv2.CAP_ANY) if backend else cv2.CAP_ANY
+    capture = cv2.VideoCapture(camera_index, api)
+    
+    if not capture.isOpened():
+        print(f"Could not open camera at index {camera_index}")
+        capture.release()
+        return None, None
     
-    # Try specific camera indices in order of preference
-    # iPhone is often detected at higher indices like 2 or above, so try those first
-    camera_indices = [1, 2, 3, 0]  # Try 1, 2, 3 first (external cameras), then 0 (built-in)
+    # Ask for the format the pipeline wants, so frames need no resize (the
+    # device may ignore any of these - the test frame shows what it delivers)
+    if config.CAMERA_FOURCC:
+        capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*config.CAMERA_FOURCC))
+    capture.set(cv2.CAP_PROP_FRAME_WIDTH, width or config.CAMERA_WIDTH)
+    capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height or config.CAMERA_HEIGHT)
+    if config.CAMERA_FPS:
+        capture.set(cv2.CAP_PROP_FPS, config.CAMERA_FPS)
     
+    ret, test_frame = capture.read()
+    if not ret or test_frame is None:
+        print(f"WARNING: Camera at index {camera_index} opened but could not read frame")
+        capture.release()
+        return None, None
+    return capture, test_frame
+
+def load_camera_cache():
+    """Return the last working camera from the cache file, or None"""
     try:
-        for camera_index in camera_indices:
-            print(f"Attempting to open camera at index {camera_index}...")
-            
-            # Try to open camera at this index
-            camera = cv2.VideoCapture(camera_index)
-            
-            if not camera.isOpened():
-                print(f"Could not open camera at index {camera_index}")
-                # Release and try next index
-                try:
-                    camera.release()
-                except:
-                    pass
-                continue
-            
-            # Successfully opened - check if we can get a frame
-            ret, test_frame = camera.read()
-            if not ret or test_frame is None:
-                print(f"WARNING: Camera at index {camera_index} opened but could not read frame")
-                try:
-                    camera.release()
-                except:
-                    pass
-                continue
-            
-            # Successfully read a frame - use this camera
-            print(f"Camera opened successfully at index {camera_index}!")
-            print(f"Camera properties:")
-            print(f" - Width: {camera.get(cv2.CAP_PROP_FRAME_WIDTH)}")
-            print(f" - Height: {camera.get(cv2.CAP_PROP_FRAME_HEIGHT)}")
-            print(f" - FPS: {camera.get(cv2.CAP_PROP_FPS)}")
-            print(f"Successfully read test frame: {test_frame.shape}")
-            
-            # If we find a camera that's not the built-in webcam (likely the iPhone), prefer it
-            if camera_index != 0:
-                add_terminal_message(f"External camera detected at index {camera_index}")
-                return True
-            
-            # Otherwise use the built-in camera
+        with open(config.CAMERA_CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_camera_cache(device):
+    """Remember a working camera and its properties for the next start"""
+    try:
+        with open(config.CAMERA_CACHE_FILE, 'w') as f:
+            json.dump(device, f, indent=2)
+    except OSError as e:
+        print(f"Could not save camera cache: {e}")
+
+def probe_cameras(camera_indices=None):
+    """Open every candidate index in parallel and return {index: (capture, test frame)}"""
+    camera_indices = camera_indices or config.CAMERA_INDICES
+    
+    with ThreadPoolExecutor(max_workers=len(camera_indices), thread_name_prefix="camera-probe") as executor:
+        results = dict(zip(camera_indices, executor.map(_open_camera, camera_indices)))
+    return {index: result for index, result in results.items() if result[0] is not None}
+
+def initialize_camera():
+    """Open the configured frame source: the cached camera, or all candidates probed in parallel (None on failure)"""
+    try:
+        # File and synthetic sources stand in for the camera (e.g. to reproduce a problem)
+        if config.FRAME_SOURCE != "live":
+            try:
+                source = frame_sources.create_frame_source()
+            except (IOError, ValueError) as e:
+                add_terminal_message(f"Frame source error: {e}")
+                return None
+            add_terminal_message(f"Using {config.FRAME_SOURCE} frame source ({config.FRAME_SOURCE_PACING} pacing)")
+            return source
+        
+        # The last working device is usually still there - try it on its own first
+        cached = load_camera_cache()
+        if cached is not None:
+            print(f"Trying cached camera at index {cached['index']} ({cached.get('backend')})...")
+            capture, test_frame = _open_camera(cached["index"], cached.get("backend"),
+                                               cached.get("width"), cached.get("height"))
+            if capture is not None:
+                add_terminal_message(f"Using cached camera at index {cached['index']}")
+                return frame_sources.LiveCameraSource(capture, cached["index"], test_frame)
+            print("Cached camera is not available - probing all cameras")
+        
+        found = probe_cameras()
+        if not found:
+            add_terminal_message("Error: Could not initialize any camera")
+            return None
+        
+        # Prefer indices in the configured order: external cameras (likely the iPhone) before the built-in one
+        camera_index = next(index for index in config.CAMERA_INDICES if index in found)
+        for index, (capture, test_frame) in found.items():
+            if index != camera_index:
+                capture.release()
+        
+        capture, test_frame = found[camera_index]
+        source = frame_sources.LiveCameraSource(capture, camera_index, test_frame)
+        device = source.describe()
+        save_camera_cache(device)
+        
+        print(f"Camera opened successfully at index {camera_index}!")
+        print(f"Camera properties:")
+        print(f" - Width: {device['width']}")
+        print(f" - Height: {device['height']}")
+        print(f" - FPS: {device['fps']}")
+        print(f" - Backend: {device['backend']}")
+        print(f" - Format: {device['fourcc']}")
+        
+        if camera_index != 0:
+            add_terminal_message(f"External camera detected at index {camera_index}")
+        else:
             add_terminal_message(f"Using built-in camera (no external camera found)")
-            return True
-            
-        # If we get here, no camera worked
-        add_terminal_message("Error: Could not initialize any camera")
-        return False
+        return source
         
     except Exception as e:
         print(f"Camera initialization error: {str(e)}")
         add_terminal_message(f"Camera error: {str(e)}")
+        return None
+
+def open_camera_setup(setup):
+    """Open the device or frame source of one entry in config.CAMERAS (None on failure)"""
+    try:
+        if "source" in setup:
+            return frame_sources.create_frame_source(setup["source"], setup.get("path"))
+        capture, test_frame = _open_camera(setup["index"], setup.get("backend"))
+        if capture is None:
+            return None
+        return frame_sources.LiveCameraSource(capture, setup["index"], test_frame)
+    except (IOError, ValueError, KeyError) as e:
+        print(f"Could not open camera {setup}: {e}")
+        return None
+
+def rescan_cameras():
+    """Forget the cached camera and probe all candidates again in the background"""
+    if camera_initialized or camera_starting:
+        add_terminal_message("Stop the camera before rescanning")
         return False
+    
+    add_terminal_message("Scanning for cameras...")
+    Thread(target=_rescan_thread_function, daemon=True).start()
+    return True
 
-def camera_thread_function():
-    """Thread function for capturing and processing camera frames"""
-    global camera_active, camera_frame, camera_surface, camera
+def _rescan_thread_function():
+    """Probe every candidate camera and cache the preferred one"""
+    start_time = time.perf_counter()
+    found = probe_cameras()
+    elapsed = time.perf_counter() - start_time
     
-    # Import dependent modules
-    _import_modules()
+    if not found:
+        if os.path.exists(config.CAMERA_CACHE_FILE):
+            os.remove(config.CAMERA_CACHE_FILE)
+        add_terminal_message(f"No cameras found ({elapsed:.1f}s)")
+        return
     
-    frame_count = 0
-    error_count = 0
+    for index, (capture, test_frame) in found.items():
+        add_terminal_message(f"Camera {index}: {test_frame.shape[1]}x{test_frame.shape[0]}")
     
+    camera_index = next(index for index in config.CAMERA_INDICES if index in found)
+    capture, test_frame = found[camera_index]
+    save_camera_cache(frame_sources.LiveCameraSource(capture, camera_index, test_frame).describe())
+    for capture, test_frame in found.values():
+        capture.release()
+    add_terminal_message(f"Found {len(found)} camera(s) in {elapsed:.1f}s, using index {camera_index}")
+
+class FrameRing:
+    """Small ring of preallocated frames holding the newest captured image"""
+    # The capture thread always writes into a slot that is neither the newest
+    # frame nor the one being processed, so it never waits for detection. The
+    # processing thread takes the newest frame; frames overwritten before they
+    # were taken are counted as dropped.
+    def __init__(self, frame_shape, num_slots=None, dtype=np.uint8):
+        num_slots = max(3, num_slots or config.CAMERA_RING_SLOTS)
+        self.slots = [np.empty(frame_shape, dtype=dtype) for _ in range(num_slots)]
+        self.timestamps = [0.0] * num_slots  # perf_counter() when each slot was published
+        self.condition = Condition()
+        self.latest = None  # Slot index of the newest frame
+        self.reading = None  # Slot index held by the processing thread
+        self.sequence = 0  # Number of frames published
+        self.read_sequence = 0  # Sequence of the last frame taken
+
+    def get_write_slot(self):
+        """Return the index of a slot the capture thread may overwrite"""
+        with self.condition:
+            for i in range(len(self.slots)):
+                if i != self.latest and i != self.reading:
+                    return i
+
+    def publish(self, slot):
+        """Make a written slot the newest frame"""
+        with self.condition:
+            self.timestamps[slot] = time.perf_counter()
+            self.latest = slot
+            self.sequence += 1
+            self.condition.notify()
+
+    def take_latest(self, timeout=0.5):
+        """Wait for a frame newer than the last one taken and return (slot, frames skipped)"""
+        with self.condition:
+            if self.sequence == self.read_sequence:
+                self.condition.wait(timeout)
+            if self.sequence == self.read_sequence:
+                return None, 0
+            skipped = self.sequence - self.read_sequence - 1
+            self.read_sequence = self.sequence
+            self.reading = self.latest
+            return self.reading, skipped
+
+    def release(self):
+        """Hand the slot being processed back to the capture thread"""
+        with self.condition:
+            self.reading = None
+
+    def wake(self):
+        """Wake a waiting processing thread (used when stopping)"""
+        with self.condition:
+            self.condition.notify_all()
+
+
+# Frame pipelines by camera id - they outlive a session, so stages can be
+# reordered or swapped before the camera starts
+camera_pipelines = {}
+
+def supports_bgr_surfaces():
+    """Check if pygame can wrap BGR pixel data directly (pygame 2.1.3+)"""
     try:
-        print("Camera thread started")
-        add_terminal_message("Camera thread started")
+        pygame.image.frombuffer(bytes(3), (1, 1), 'BGR')
+        return True
+    except ValueError:
+        return False
+
+def get_tile_rects(count):
+    """Split the camera display area into a grid of equal tiles, one per camera"""
+    rect = config.CAMERA_DISPLAY_RECT
+    columns = int(np.ceil(np.sqrt(count)))
+    rows = int(np.ceil(count / columns))
+    width, height = rect.width // columns, rect.height // rows
+    return [pygame.Rect(rect.left + (i % columns) * width, rect.top + (i // columns) * height, width, height)
+            for i in range(count)]
+
+class CameraInstance:
+    """One camera with its own capture and processing threads, display surfaces and piano range"""
+    def __init__(self, camera_id, source, tile, setup=None):
+        setup = setup or {}
+        self.camera_id = camera_id
+        self.source = source
+        self.tile = tile  # Screen rect this camera is shown in
+        self.notes = setup.get("notes")  # (lowest, highest) MIDI note played, None = the piano overlay
+        self.region = setup.get("region")  # (left, top, right, bottom) frame fractions, None = the overlay lines
+        self.pipeline = get_camera_pipeline(camera_id)
+        self.frame_ring = FrameRing(source.frame_shape)
+        self.detection_gate = motion_gate.MotionGate()
+        self.governor = quality_governor.QualityGovernor(f"Camera {camera_id}")
+        _import_modules()
+        # Own cascade (preloaded by the warm-up, or loaded here off the UI thread) and
+        # buffers, so cameras detect in parallel
+        self.detector = hand_detection_module.HandDetector(hand_detection_module.take_cascade())
+        self.tracker = hand_tracker.HandTracker(self.detector)
+        self.pool = None  # Detection worker processes (only with DETECTION_WORKERS > 0)
+        self.active = False
         
-        while config.camera_active:
-            if camera is None:
-                print("ERROR: Camera is None in thread!")
-                add_terminal_message("Camera error: Device disconnected")
-                break
-                
-            # Capture frame
-            ret, frame = camera.read()
+        # Preallocated display surfaces: the processing thread fills one while the UI
+        # shows the other, so no Surface is created per frame. In BGR mode each surface
+        # is a view of a NumPy frame, so the processed frame is shown without a copy.
+        self.display_frames = []
+        self.display_surfaces = []
+        self.display_index = 0
+        self.display_bgr = False
+        self.surface_allocations = 0
+        self.frame = None  # Last processed frame
+        self.surface = None  # Surface the UI shows (None until the first frame)
+        
+        # Pipeline stages skipped because the camera already delivers the display format
+        self.skipped_stages = []
+        self.saved_ms_per_frame = 0.0
+        
+        # Statistics
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.latency = frame_pipeline.RollingTimer()  # Capture to displayed
+        self.frame_interval = frame_pipeline.RollingTimer()
+        self.last_display_time = None
+        self.start_time = None
+        self.cascade_runs = 0
+        self.detected_pixels = 0  # Pixels the cascade searched
+        self.frame_pixels = 0  # Pixels of the frames it searched them in
+    
+    def start(self):
+        """Start the capture and processing threads"""
+        self.active = True
+        self.start_time = time.perf_counter()
+        
+        # Capture and processing run separately so slow detection never stalls capture
+        capture_thread = Thread(target=self.capture_thread_function, name=f"camera-{self.camera_id}-capture")
+        capture_thread.daemon = True
+        capture_thread.start()
+        
+        processing_thread = Thread(target=self.processing_thread_function, name=f"camera-{self.camera_id}-processing")
+        processing_thread.daemon = True
+        processing_thread.start()
+    
+    def stop(self):
+        """Ask both threads to finish (the capture thread releases the device)"""
+        self.active = False
+        self.frame_ring.wake()
+    
+    def get_detection_region(self, frame_width, frame_height):
+        """Get the area fingertips are detected and played in as (x, y, w, h), or None for the whole frame"""
+        if self.region is not None:
+            left, top, right, bottom = self.region
+            return (int(left * frame_width), int(top * frame_height),
+                    int((right - left) * frame_width), int((bottom - top) * frame_height))
+        if len(cameras) == 1:
+            # The overlay lines are drawn over the full display, so they only fit a single camera
+            return overlay.get_detection_region(frame_width, frame_height)
+        return None
+    
+    def get_detection_roi(self, frame_width, frame_height):
+        """Get the detection region grown by the margin (so hands crossing its edge are found), or None"""
+        region = self.get_detection_region(frame_width, frame_height)
+        if region is None:
+            return None
+        x, y, w, h = region
+        margin = config.DETECTION_ROI_MARGIN
+        left, top = max(0, x - margin), max(0, y - margin)
+        right, bottom = min(frame_width, x + w + margin), min(frame_height, y + h + margin)
+        return left, top, right - left, bottom - top
+    
+    def _get_display_buffer(self, size, bgr):
+        """Return (backing frame or None, surface) for the back buffer, (re)creating the pair if needed"""
+        if not self.display_surfaces or self.display_surfaces[0].get_size() != size or self.display_bgr != bgr:
+            if bgr:
+                self.display_frames = [np.empty((size[1], size[0], 3), dtype=np.uint8) for _ in range(2)]
+                self.display_surfaces = [pygame.image.frombuffer(frame, size, 'BGR') for frame in self.display_frames]
+            else:
+                self.display_frames = [None, None]
+                self.display_surfaces = [pygame.Surface(size, depth=24) for _ in range(2)]
+            self.display_index = 0
+            self.display_bgr = bgr
+            self.surface_allocations += 2
+        self.display_index ^= 1
+        return self.display_frames[self.display_index], self.display_surfaces[self.display_index]
+    
+    def _measure_skipped_stages(self, source, display_size, skip_resize, skip_color):
+        """Time the stages the old fixed pipeline would run on this frame"""
+        self.skipped_stages = []
+        saved = 0.0
+        repeats = 20
+        if skip_color:
+            start_time = time.perf_counter()
+            for _ in range(repeats):
+                cv2.cvtColor(source, cv2.COLOR_BGR2RGB)
+            saved += (time.perf_counter() - start_time) / repeats
+            self.skipped_stages.append("BGR->RGB conversion")
+        if skip_resize:
+            start_time = time.perf_counter()
+            for _ in range(repeats):
+                cv2.resize(source, display_size)
+            saved += (time.perf_counter() - start_time) / repeats
+            self.skipped_stages.append("resize")
+        self.saved_ms_per_frame = saved * 1000
+        
+        if self.skipped_stages:
+            add_terminal_message(f"Camera {self.camera_id}: skipping {', '.join(self.skipped_stages)} "
+                                 f"(~{self.saved_ms_per_frame:.2f}ms CPU per frame)")
+        else:
+            add_terminal_message(f"Camera {self.camera_id}: format differs from display - "
+                                 f"resize and color conversion needed")
+    
+    def get_rates(self):
+        """Return (frames shown per second, median capture-to-display latency in ms)"""
+        interval_p50 = self.frame_interval.percentiles()[0]
+        return (1000.0 / interval_p50 if interval_p50 > 0 else 0.0), self.latency.percentiles()[0]
+    
+    def get_stats(self):
+        """Return a dict of frame counts, rates and timings for this camera"""
+        fps = self.get_rates()[0]
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        latency_p50, latency_p95, latency_p99 = self.latency.percentiles()
+        return {
+            "camera": self.camera_id,
+            "captured": self.frames_captured,
+            "processed": self.frames_processed,
+            "dropped": self.frames_dropped,
+            "fps": fps,
+            "latency_p50": latency_p50,
+            "latency_p95": latency_p95,
+            "latency_p99": latency_p99,
+            "surface_allocations": self.surface_allocations,
+            "detector_allocations": self.detector.allocations,
+            "cascade_loaded": self.detector.cascade is not None,
+            "skipped_stages": list(self.skipped_stages),
+            "saved_ms": self.saved_ms_per_frame * self.frames_processed,
+            "stage_timings": self.pipeline.get_timings(),
+            "detection_skipped": self.pool.skipped if self.pool is not None else 0,
+            "motion_skipped_percent": self.detection_gate.get_skip_percent(),
+            "detection_area_percent": 100.0 * self.detected_pixels / self.frame_pixels if self.frame_pixels else 100.0,
+            "cascade_per_second": self.cascade_runs / elapsed if elapsed > 0 else 0.0,
+            "frames_tracked": self.tracker.frames_tracked,
+            "tracks_lost": self.tracker.tracks_lost,
+            "quality_level": self.governor.level,
+            "quality_changes": self.governor.level_changes,
+            "detection_overruns": self.governor.overruns
+        }
+    
+    def format_stats(self):
+        """Return a one-line summary for the terminal"""
+        stats = self.get_stats()
+        return (f"Camera {self.camera_id}: {stats['fps']:.1f} fps, latency p50 {stats['latency_p50']:.1f}ms "
+                f"p95 {stats['latency_p95']:.1f}ms, {stats['captured']} captured, {stats['processed']} processed, "
+                f"{stats['dropped']} dropped")
+    
+    def capture_thread_function(self):
+        """Thread function reading frames from the camera into the frame ring"""
+        frame_ring = self.frame_ring
+        error_count = 0
+        
+        try:
+            print(f"Capture thread {self.camera_id} started")
             
-            if not ret or frame is None:
-                error_count += 1
-                print(f"Error capturing frame ({error_count} errors)")
+            while self.active:
+                # Read straight into a preallocated slot (paced by the camera itself)
+                slot = frame_ring.get_write_slot()
+                ret, frame = self.source.read(image=frame_ring.slots[slot])
                 
-                if error_count > 5:
-                    print("Too many frame errors - sleeping")
-                    time.sleep(1.0)
-                else:
-                    time.sleep(0.1)
-                continue
-            
-            # Successfully got a frame - flip it horizontally for mirror effect
-            frame = cv2.flip(frame, 1)
-            frame_count += 1
-            
-            if frame_count % 30 == 0:  # Log every 30 frames
-                print(f"Processed {frame_count} frames")
-            
-            error_count = 0  # Reset error counter on success
-            
-            # Convert frame from BGR to RGB (for pygame display)
-            try:
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            except Exception as e:
-                print(f"Error in color conversion: {e}")
-                continue
-            
-            # Resize frame to fit display area
-            try:
-                frame = cv2.resize(frame, (config.CAMERA_DISPLAY_RECT.width, config.CAMERA_DISPLAY_RECT.height))
-            except Exception as e:
-                print(f"Error in resize: {e}")
-                continue
-            
-            # Process frame based on current mode
-            try:
-                if config.calibration_mode:
-                    # Auto calibration mode
-                    frame = calibration_module.process_calibration_frame(frame)
-                elif config.manual_calibration_mode:
-                    # Manual calibration mode
-                    frame = calibration_module.process_manual_calibration_frame(frame)
-                else:
-                    # Regular hand detection mode
-                    frame, fingertips = hand_detection_module.detect_fingertips(frame)
-            except Exception as e:
-                print(f"Error in frame processing: {e}")
-                # Continue with unprocessed frame
-                pass
-            
-            # Store the frame for reference
-            camera_frame = frame
+                if not ret and getattr(self.source, "finished", False):
+                    add_terminal_message(f"Camera {self.camera_id}: frame source finished")
+                    break
+                
+                if not ret or frame is None:
+                    error_count += 1
+                    print(f"Error capturing frame on camera {self.camera_id} ({error_count} errors)")
+                    
+                    if error_count > 5:
+                        print("Too many frame errors - sleeping")
+                        time.sleep(1.0)
+                    else:
+                        time.sleep(0.1)
+                    continue
+                
+                if frame is not frame_ring.slots[slot]:
+                    # The backend returned a new array (e.g. the frame size changed)
+                    frame_ring.slots[slot] = frame
+                
+                error_count = 0  # Reset error counter on success
+                self.frames_captured += 1
+                frame_ring.publish(slot)
+        
+        except Exception as e:
+            print(f"Capture thread error: {str(e)}")
+            add_terminal_message(f"Camera {self.camera_id} thread error: {str(e)}")
+        finally:
+            print(f"Capture thread {self.camera_id} ending")
+            self.active = False
+            frame_ring.wake()
+            self.source.release()
+            if not any(instance.active for instance in cameras):
+                config.camera_active = False
+    
+    def processing_thread_function(self):
+        """Thread function running the newest captured frame through the pipeline"""
+        frame_ring = self.frame_ring
+        pipeline = self.pipeline
+        detection_stage = pipeline.get("hand_detection")
+        if config.DETECTION_WORKERS > 0:
+            detection_stage.function = _pooled_detection_stage
+        elif detection_stage.function is _pooled_detection_stage:
+            detection_stage.function = _hand_detection_stage
+        bgr_display = config.CAMERA_BGR_PIPELINE and supports_bgr_surfaces()
+        config.camera_color_order = "BGR" if bgr_display else "RGB"
+        measured_shape = None
+        
+        # One context is reused for every frame, so its buffers are allocated once
+        context = frame_pipeline.FrameContext(instance=self, bgr=bgr_display, resized=None, work_frame=None,
+                                              holding_slot=False, last_detection=None, frames_since_cascade=0)
+        
+        try:
+            print(f"Camera thread {self.camera_id} started")
+            add_terminal_message(f"Camera {self.camera_id} thread started")
             
-            # Very important: Use the exact method from your original code
-            # Create a pygame surface from the processed frame
-            try:
-                # Debug the frame shape
-                print(f"Frame shape before processing: {frame.shape}")
+            while self.active:
+                # Always work on the newest frame - anything older is stale
+                slot, skipped = frame_ring.take_latest()
+                if slot is None:
+                    continue
+                self.frames_dropped += skipped
+                captured_at = frame_ring.timestamps[slot]
                 
-                # This approach worked in your original code - use transpose instead of rot90
-                # to avoid any shape issues
-                frame_rgb = frame.copy()  # Ensure we have a fresh copy
-                camera_surface = pygame.surfarray.make_surface(frame_rgb.transpose(1, 0, 2))
+                source = frame_ring.slots[slot]
+                display_size = self.tile.size
+                if source.shape != measured_shape:
+                    measured_shape = source.shape
+                    needs_resize = source.shape[:2] != (display_size[1], display_size[0])
+                    self._measure_skipped_stages(source, display_size, not needs_resize, bgr_display)
                 
-                # Debug successful surface creation
-                if camera_surface:
-                    print(f"Successfully created surface: {camera_surface.get_size()}")
+                # In BGR mode the frame is processed in the array behind the display surface
+                target, surface = self._get_display_buffer(display_size, bgr_display)
+                if target is None:
+                    if context.work_frame is None or context.work_frame.shape[:2] != (display_size[1], display_size[0]):
+                        context.work_frame = np.empty((display_size[1], display_size[0], 3), dtype=np.uint8)
+                    target = context.work_frame
                 
-            except Exception as e:
-                print(f"Error creating pygame surface with transpose: {e}")
+                context.frame = source
+                context.holding_slot = True
+                context.display_size = display_size
+                context.target = target
+                context.surface = surface
+                context.fingertips = []
+                context.motion = True  # Stays set when the motion gate is disabled
                 
-                # Try alternate methods if the first fails
                 try:
-                    print("Trying alternative surface creation method...")
-                    # Try direct conversion
-                    camera_surface = pygame.image.frombuffer(
-                        frame.tobytes(), (frame.shape[1], frame.shape[0]), 'RGB')
-                    print(f"Created surface using frombuffer: {camera_surface.get_size()}")
-                except Exception as e2:
-                    print(f"All surface creation methods failed: {e}, {e2}")
-                    continue
-            
-            # Check if camera_surface was successfully created
-            if camera_surface is None:
-                print("Warning: Failed to create camera surface")
+                    processed = pipeline.run(context)
+                finally:
+                    _release_source(context)
                 
-            time.sleep(0.03)  # ~30 FPS
+                if processed:
+                    now = time.perf_counter()
+                    self.latency.record(now - captured_at)
+                    if self.last_display_time is not None:
+                        self.frame_interval.record(now - self.last_display_time)
+                    self.last_display_time = now
+                    self.frames_processed += 1
+                    if self.frames_processed % 30 == 0:  # Log every 30 frames
+                        print(f"Camera {self.camera_id}: processed {self.frames_processed} frames "
+                              f"({self.frames_dropped} dropped)")
+        
+        except Exception as e:
+            print(f"Camera thread error: {str(e)}")
+            add_terminal_message(f"Camera {self.camera_id} thread error: {str(e)}")
+        finally:
+            fingertip_notes.note_stream.clear(self.camera_id)
+            if self.pool is not None:
+                self.pool.close()
+                self.pool = None
+            print(f"Camera thread {self.camera_id} ending")
+
+def get_camera_stats(camera_id=0):
+    """Return a dict of frame counts, rates and timings for one camera of the current session"""
+    for instance in cameras:
+        if instance.camera_id == camera_id:
+            return instance.get_stats()
+    return {}
+
+def get_all_camera_stats():
+    """Return the stats of every camera of the current session"""
+    return [instance.get_stats() for instance in cameras]
+
+def _release_source(context):
+    """Hand the ring slot back to the capture thread once a stage has copied it"""
+    if context.holding_slot:
+        context.holding_slot = False
+        context.instance.frame_ring.release()
+
+def _resize_stage(context):
+    """Scale the camera frame to the display size"""
+    width, height = context.display_size
+    if context.resized is None or context.resized.shape[:2] != (height, width):
+        context.resized = np.empty((height, width, 3), dtype=np.uint8)
+    cv2.resize(context.frame, context.display_size, dst=context.resized)
+    context.frame = context.resized
+    _release_source(context)
+
+def _flip_stage(context):
+    """Mirror the frame into the display buffer"""
+    context.frame = cv2.flip(context.frame, 1, dst=context.target)
+    _release_source(context)
+
+def _color_stage(context):
+    """Convert BGR to RGB in place for pygame"""
+    cv2.cvtColor(context.frame, cv2.COLOR_BGR2RGB, dst=context.frame)
+
+def _auto_calibration_stage(context):
+    context.frame = calibration_module.process_calibration_frame(context.frame)
+
+def _manual_calibration_stage(context):
+    context.frame = calibration_module.process_manual_calibration_frame(context.frame)
+
+def _motion_gate_stage(context):
+    """Decide whether anything moved in the detection region since the last detection"""
+    height, width = context.frame.shape[:2]
+    region = context.instance.get_detection_region(width, height)
+    context.motion = (context.last_detection is None or
+                      context.instance.detection_gate.needs_detection(context.frame, region))
+
+def _hand_detection_stage(context):
+    if context.motion:
+        instance = context.instance
+        governor = instance.governor
+        settings = governor.get_settings()
+        
+        # Only the overlay region (plus a margin) is searched while the overlay is on
+        height, width = context.frame.shape[:2]
+        roi = instance.get_detection_roi(width, height)
+        
+        # Between cascade runs the hands are followed by the tracker (or, without
+        # it, looked for in the previous rects); a lost track runs the cascade
+        interval = settings["cascade_interval"]
+        if config.HAND_TRACKING:
+            interval = max(interval, config.TRACK_CASCADE_INTERVAL)
+        
+        start_time = time.perf_counter()
+        hands = None
+        if context.last_detection is not None and context.frames_since_cascade + 1 < interval:
+            hands = instance.tracker.track(context.frame, roi) if config.HAND_TRACKING else context.last_detection[0]
+        
+        if hands is None:
+            context.frames_since_cascade = 0
+            instance.cascade_runs += 1
+            instance.detected_pixels += roi[2] * roi[3] if roi is not None else width * height
+            instance.frame_pixels += width * height
+            hands = instance.detector.detect_hands(context.frame, settings, roi)
+            if config.HAND_TRACKING:
+                hands = instance.tracker.reconcile(context.frame, hands)
+        else:
+            context.frames_since_cascade += 1
+        context.last_detection = instance.detector.find_fingertips(context.frame, settings, hands, roi)
+        if config.QUALITY_GOVERNOR_ENABLED:
+            governor.record(time.perf_counter() - start_time)
     
-    except Exception as e:
-        print(f"Camera thread error: {str(e)}")
-        add_terminal_message(f"Camera thread error: {str(e)}")
-    finally:
-        print("Camera thread ending")
-        if camera is not None:
-            camera.release()
-            camera = None
+    # When nothing moved the previous result is drawn again
+    hands, fingertips = context.last_detection
+    hand_detection_module.draw_detections(context.frame, hands, fingertips)
+    context.fingertips = fingertips
+
+def _pooled_detection_stage(context):
+    """Hand the frame to the detection workers and draw the newest in-order result"""
+    instance = context.instance
+    if instance.pool is None or instance.pool.frame_shape != context.frame.shape:
+        if instance.pool is not None:
+            instance.pool.close()
+        instance.pool = detection_pool.DetectionPool(config.DETECTION_WORKERS, context.frame.shape)
+        print(f"Camera {instance.camera_id}: detection pool started with {instance.pool.num_workers} workers")
+    if context.motion:
+        height, width = context.frame.shape[:2]
+        instance.pool.submit(context.frame, instance.get_detection_roi(width, height))
+    results = instance.pool.collect()
+    if results:
+        context.last_detection = results[-1][1:]
+    
+    # Annotations trail the shown frame by however long the workers take
+    if context.last_detection is not None:
+        hands, fingertips = context.last_detection
+        hand_detection_module.draw_detections(context.frame, hands, fingertips)
+        context.fingertips = fingertips
+
+def _fingertip_notes_stage(context):
+    """Report the keys under this camera's fingertips to the shared note stream"""
+    instance = context.instance
+    keys = set()
+    span = fingertip_notes.get_piano_span(instance.notes)
+    if span is not None:
+        height, width = context.frame.shape[:2]
+        region = instance.get_detection_region(width, height) or (0, 0, width, height)
+        keys = fingertip_notes.keys_for_fingertips(context.fingertips, region, span)
+    fingertip_notes.note_stream.update(instance.camera_id, keys)
+
+def _display_stage(context):
+    """Make the processed frame the shown camera surface"""
+    instance = context.instance
+    
+    # Some stages return a new frame (e.g. the manual calibration preview)
+    target = context.target
+    if context.frame is not target:
+        if context.frame.shape == target.shape:
+            np.copyto(target, context.frame)
+        else:
+            cv2.resize(context.frame, context.display_size, dst=target)
+    
+    # Store the frame for reference
+    instance.frame = target
+    
+    if not context.bgr:
+        # transpose is a view - blit_array copies straight into the surface pixels
+        pygame.surfarray.blit_array(context.surface, target.transpose(1, 0, 2))
+    instance.surface = context.surface
+
+def create_camera_pipeline():
+    """Build the default frame pipeline (stages can be reordered, disabled or swapped later)"""
+    _import_modules()
+    
+    calibrating = lambda context: config.calibration_mode
+    manual_calibrating = lambda context: config.manual_calibration_mode and not config.calibration_mode
+    detecting = lambda context: not config.calibration_mode and not config.manual_calibration_mode
+    
+    return frame_pipeline.Pipeline([
+        frame_pipeline.Stage("resize", _resize_stage, critical=True,
+                             predicate=lambda context: context.frame.shape[:2] != context.target.shape[:2]),
+        frame_pipeline.Stage("flip", _flip_stage, critical=True),
+        frame_pipeline.Stage("color", _color_stage, critical=True, predicate=lambda context: not context.bgr),
+        frame_pipeline.Stage("auto_calibration", _auto_calibration_stage, predicate=calibrating),
+        frame_pipeline.Stage("manual_calibration", _manual_calibration_stage, predicate=manual_calibrating),
+        frame_pipeline.Stage("motion_gate", _motion_gate_stage,
+                             predicate=lambda context: config.MOTION_GATE_ENABLED and detecting(context)),
+        frame_pipeline.Stage("hand_detection", _hand_detection_stage, predicate=detecting),
+        frame_pipeline.Stage("fingertip_notes", _fingertip_notes_stage,
+                             predicate=lambda context: config.FINGERTIP_NOTES and detecting(context)),
+        frame_pipeline.Stage("display", _display_stage, critical=True)
+    ])
+
+def get_camera_pipeline(camera_id=0):
+    """Return the pipeline of one camera, creating it on first use"""
+    if camera_id not in camera_pipelines:
+        camera_pipelines[camera_id] = create_camera_pipeline()
+    return camera_pipelines[camera_id]
 
 # These variables help ensure the camera is initialized properly
 camera_initialized = False
 camera_starting = False
 
 def start_camera_thread():
-    """Start the camera capture thread - This gets called when Begin button is clicked"""
-    global camera, camera_initialized, camera_starting
+    """Start opening the cameras in the background - This gets called when Begin button is clicked"""
+    global cameras, camera_starting
     
     # Prevent multiple simultaneous initialization attempts
     if camera_starting:
@@ -227,42 +751,79 @@ def start_camera_thread():
         return False
         
     camera_starting = True
+    cameras = []  # Show "initializing" until the first new frame
     
-    # Make sure camera is closed if already open
-    if camera is not None:
-        try:
-            camera.release()
-        except:
-            pass
-        camera = None
+    # Opening/probing can take seconds, so it runs off the UI thread
+    add_terminal_message("Opening camera...")
+    config.recording = True
+    start_thread = Thread(target=_start_camera_thread_function)
+    start_thread.daemon = True
+    start_thread.start()
+    return True
+
+def _open_sources():
+    """Open every configured camera at once, returning [(source, setup)] for those that opened"""
+    if not config.CAMERAS:
+        source = initialize_camera()
+        return [(source, None)] if source is not None else []
+    
+    with ThreadPoolExecutor(max_workers=len(config.CAMERAS), thread_name_prefix="camera-open") as executor:
+        sources = list(executor.map(open_camera_setup, config.CAMERAS))
+    for setup, source in zip(config.CAMERAS, sources):
+        if source is None:
+            add_terminal_message(f"Could not open camera {setup.get('index', setup.get('source'))}")
+    return [(source, setup) for source, setup in zip(sources, config.CAMERAS) if source is not None]
+
+def _start_camera_thread_function():
+    """Open the cameras and start their capture and processing threads"""
+    global cameras, camera_initialized, camera_starting
     
-    # Initialize new camera
-    if initialize_camera():
+    opened = _open_sources()
+    if opened and not config.recording:
+        # Stopped while we were still opening the devices
+        for source, setup in opened:
+            source.release()
+    elif opened:
         config.camera_active = True
         config.recording = True
         camera_initialized = True
-        add_terminal_message("Camera started...")
         
-        # Start camera thread
-        camera_thread = Thread(target=camera_thread_function)
-        camera_thread.daemon = True
-        camera_thread.start()
-        camera_starting = False
-        return True
+        tiles = get_tile_rects(len(opened))
+        cameras = [CameraInstance(i, source, tile, setup) for i, ((source, setup), tile) in enumerate(zip(opened, tiles))]
+        for instance in cameras:
+            instance.start()
+        add_terminal_message("Camera started..." if len(cameras) == 1 else f"{len(cameras)} cameras started...")
     else:
         add_terminal_message("Failed to start camera!")
-        camera_starting = False
-        return False
+        config.recording = False
+    camera_starting = False
 
 def stop_camera():
-    """Stop the camera and release resources"""
-    global camera, camera_initialized
+    """Stop the cameras and release resources"""
+    global camera_initialized
     
     config.camera_active = False
     config.recording = False
     camera_initialized = False
     add_terminal_message("Camera stopped")
-    
-    if camera is not None:
-        camera.release()
-        camera = None
\ No newline at end of file
+    for instance in cameras:
+        add_terminal_message(instance.format_stats())
+        if instance.skipped_stages:
+            add_terminal_message(f"Skipped {', '.join(instance.skipped_stages)}: "
+                                 f"~{instance.saved_ms_per_frame * instance.frames_processed:.0f}ms CPU saved")
+        gate = instance.detection_gate
+        if gate.frames_checked:
+            add_terminal_message(f"Motion gate skipped detection on {gate.get_skip_percent():.0f}% "
+                                 f"of {gate.frames_checked} frames")
+        governor = instance.governor
+        if config.HAND_TRACKING and instance.cascade_runs:
+            add_terminal_message(f"Cascade ran on {instance.cascade_runs} frames, tracker on "
+                                 f"{instance.tracker.frames_tracked} ({instance.tracker.tracks_lost} tracks lost)")
+        if governor.level_changes:
+            add_terminal_message(f"Detection quality changed {governor.level_changes} times, ended at level "
+                                 f"{governor.level} ({governor.overruns} frames over budget)")
+        for line in instance.pipeline.format_timings():
+            add_terminal_message(line)
+        
+        # The capture thread releases the camera once its current read returns
+        instance.stop()
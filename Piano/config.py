@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # config.py - Configuration settings and initialization for the application
 
+import os
+import json
 import pygame
 import pygame.mixer
 
@@ -59,10 +61,127 @@ NUM_KEYS = 88
 START_NOTE = 21  # A0 MIDI note number
 KEY_PATTERN = [True, False, True, False, True, True, False, True, False, True, False, True]  # W,B,W,B,W,W,B,W,B,W,B,W
 
+# Audio mixer format (the sample bank is stored in this format)
+MIXER_FREQUENCY = 44100
+MIXER_SIZE = -16  # Signed 16-bit samples
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 1024  # Overridden by the audio profile written by latency_probe.py
+AUDIO_PROFILE_FILE = "audio-profile.json"
+
+# Note playback engine
+AUDIO_ENGINE = "pygame"  # "pygame" plays each Sound directly, "numpy" mixes voices in mixer_engine.py
+MIXER_VOICES = 32  # Maximum simultaneous voices in the numpy engine
+VOICE_STEAL_POLICY = "oldest"  # "oldest" or "quietest"
+MIXER_BLOCK_SIZE = 512  # Frames mixed per output block
+MIXER_QUEUE_BLOCKS = 2  # Blocks in each queued Sound (rides out longer stalls, each adds a block of latency)
+VOICE_RAMP_MS = 5  # Gain ramp length used to avoid clicks
+MIXER_MASTER_GAIN = 0.5  # Headroom so chords do not clip
+
+# Effects applied to the numpy engine output (effects.py)
+REVERB_IR_FILE = None  # 16-bit WAV impulse response, e.g. "hall.wav"
+REVERB_WET = 0.25  # Reverb mix (0 = dry, 1 = fully wet)
+EQ_GAINS_DB = (0.0, 0.0, 0.0)  # Low, mid and high band gains
+EQ_CROSSOVERS_HZ = (250, 4000)  # Low/mid and mid/high crossover frequencies
+
+# Channel pool for the pygame engine (voice_pool.py)
+PYGAME_VOICES = 32  # Mixer channels managed for note playback
+PYGAME_STEAL_POLICY = "oldest"  # "oldest", "quietest" or "none" (drop new notes when full)
+VOICE_DECAY_SECONDS = 1.5  # Estimated piano decay used by the "quietest" policy
+NOTE_RELEASE_MS = 120  # Fade-out when a played note is released (MIDI note-off)
+
+# Sample locations
+SOUND_DIR = "piano-mp3"
+SAMPLE_BANK_FILE = "piano-bank.pcm"  # Packed PCM built by sample_bank.py
+SAMPLE_BANK_INDEX = "piano-bank.json"  # Offsets and format of the packed PCM
+
+# Sparse sample mode for memory-constrained machines
+SAMPLE_MODE = "full"  # "full" loads all 88 samples, "sparse" pitch-shifts from every Nth sample
+SPARSE_SAMPLE_STEP = 3  # Semitones between loaded samples (3 = minor third)
+SPARSE_CACHE_SIZE = 24  # Pitch-shifted notes kept in the LRU cache
+
+# Note event logging (formatted off the trigger path by event_log.py)
+EVENT_LOG_SIZE = 1024  # Ring buffer slots
+EVENT_LOG_RATE_HZ = 10  # Consumer wake-ups per second
+EVENT_LOG_LINES = 5  # Lines written per wake-up, the rest are summarised
+TERMINAL_HISTORY = 500  # Messages kept in the terminal panel
+
+# MIDI file playback (midi_player.py)
+MIDI_FILE = None  # e.g. "song.mid" to play a MIDI file at startup
+MIDI_LOOKAHEAD_MS = 50  # How far ahead notes are handed to the audio engine
+MIDI_SPEED = 1.0  # Playback tempo multiplier
+
+# Session recording (rendered to WAV offline with offline_render.py)
+RECORD_SESSION_FILE = None  # e.g. "session.json" to record every note played
+
+# Camera capture (camera.py)
+CAMERA_INDICES = [1, 2, 3, 0]  # Probe order: external cameras (e.g. iPhone) first, then built-in
+CAMERA_CACHE_FILE = "camera-cache.json"  # Last working camera and its negotiated properties
+CAMERA_WIDTH, CAMERA_HEIGHT = 640, 480  # Requested capture size (matching the display skips the resize)
+CAMERA_FPS = 30  # Requested frame rate
+CAMERA_FOURCC = "MJPG"  # Requested pixel format (None to keep the device default)
+CAMERA_BGR_PIPELINE = True  # Process and show frames in OpenCV's BGR order (skips BGR->RGB)
+# Cameras for larger installs, each with its own threads and piano range, e.g.
+# [{"index": 1, "notes": (21, 64)}, {"index": 2, "notes": (65, 108)}]. An entry may use
+# "source"/"path" (see FRAME_SOURCE) instead of "index", and "region": (left, top, right,
+# bottom) as fractions of the frame to limit where fingertips play. None = one probed camera.
+CAMERAS = None
+FINGERTIP_NOTES = False  # Play the keys under detected fingertips (mapped through the overlay or "notes")
+
+# Frame source (frame_sources.py) - stand-ins for the camera for testing and benchmarks
+FRAME_SOURCE = "live"  # "live", "video", "images" or "synthetic"
+FRAME_SOURCE_PATH = None  # Video file or image directory for the file sources
+FRAME_SOURCE_PACING = "realtime"  # "realtime" (file frame rate) or "fast" (as fast as possible)
+FRAME_SOURCE_LOOP = True  # Restart file sources at the end
+PIPELINE_TIMING_WINDOW = 300  # Frames kept per stage for the p50/p95/p99 timings
+CAMERA_RING_SLOTS = 3  # Preallocated frames shared by the capture and processing threads
+DETECTION_WORKERS = 0  # Hand detection worker processes (0 = detect in the camera thread)
+MOTION_GATE_ENABLED = True  # Skip hand detection while the detection area is still
+MOTION_GATE_THRESHOLD = 0.01  # Fraction of pixels that must change to run detection
+MOTION_GATE_PIXEL_DELTA = 15  # Gray-level difference counted as a changed pixel
+MOTION_GATE_MAX_SKIP = 15  # Run detection at least every N+1 frames even when nothing moves
+MOTION_GATE_SCALE = 0.25  # Downscale factor of the image the gate compares
+DETECTION_ROI_MARGIN = 40  # Pixels searched around the overlay region (catches hands crossing its edge)
+DETECTION_SCALE = 1.0  # Resolution the cascade searches at (e.g. 0.5 or 0.25), times the quality level's scale
+HAND_MIN_SIZE = 0.1  # Smallest hand the cascade looks for, as a fraction of the frame width (None = no limit)
+HAND_MAX_SIZE = 0.75  # Largest hand, as a fraction of the frame width - set both from the keyboard distance
+FINGERTIP_MIN_DEFECT_DEPTH = 0  # Ignore convexity defects shallower than this many pixels (0 keeps all)
+
+# Detection quality levels, best first. The governor (quality_governor.py) steps
+# down a level when detection overruns its budget and back up when there is
+# headroom. scale is the processing resolution of the cascade; cascade_interval
+# runs the cascade every Nth detected frame and reuses the hand rects in between.
+DETECTION_QUALITY_LEVELS = [
+    {"scale_factor": 1.1, "min_neighbors": 5, "scale": 1.0, "cascade_interval": 1},
+    {"scale_factor": 1.3, "min_neighbors": 5, "scale": 1.0, "cascade_interval": 1},
+    {"scale_factor": 1.3, "min_neighbors": 4, "scale": 0.75, "cascade_interval": 1},
+    {"scale_factor": 1.3, "min_neighbors": 4, "scale": 0.5, "cascade_interval": 2},
+    {"scale_factor": 1.4, "min_neighbors": 3, "scale": 0.5, "cascade_interval": 3},
+    {"scale_factor": 1.5, "min_neighbors": 3, "scale": 0.4, "cascade_interval": 4}
+]
+DETECTION_START_LEVEL = 1  # Index of the level used at startup (and without the governor)
+DETECTION_BUDGET_MS = 25  # Average detection time per frame the governor holds to
+QUALITY_GOVERNOR_ENABLED = True
+QUALITY_GOVERNOR_WINDOW = 15  # Detected frames averaged before each decision
+QUALITY_GOVERNOR_HEADROOM = 0.5  # Step quality back up when under this fraction of the budget
+
+# Detect-then-track (hand_tracker.py): between cascade runs hand boxes follow the skin blob with CamShift
+HAND_TRACKING = True
+TRACK_CASCADE_INTERVAL = 5  # Run the cascade at least every N detected frames (and whenever a track is lost)
+TRACK_MIN_FILL = 0.2  # Fraction of skin a tracked box must keep, below this the track is lost
+TRACK_MIN_AREA = 100  # Smallest blob window in pixels before the track counts as lost
+TRACK_MATCH_OVERLAP = 0.3  # Overlap (IoU) for a cascade box to continue an existing track
+TRACK_MAX_MISSES = 1  # Cascade runs a track may survive without being detected
+
+# Startup warm-up settings
+WARMUP_WORKERS = 4  # Threads decoding samples in the background
+PRELOAD_FONTS = [('Arial', 10, False), ('Arial', 14, False), ('Arial', 16, False), ('Arial', 16, True),
+                 ('Arial', 20, False), ('Courier', 16, False), ('Courier', 18, True)]
+
 # Button configuration
-BUTTON_LABELS = ["Begin", "Add/Remove Overlay", "Keyboard Mode", "Auto Calibrate", "Manual Calibrate", "Quit Program"]
-BUTTON_COLORS = [BLUE, BLUE, BLUE, BLUE, BLUE, GREEN]
-BUTTON_ACTIVE_COLORS = [DARK_BLUE, DARK_BLUE, DARK_BLUE, DARK_BLUE, DARK_BLUE, DARK_GREEN]
+BUTTON_LABELS = ["Begin", "Add/Remove Overlay", "Keyboard Mode", "Auto Calibrate", "Manual Calibrate",
+                 "Rescan Cameras", "Quit Program"]
+BUTTON_COLORS = [BLUE, BLUE, BLUE, BLUE, BLUE, BLUE, GREEN]
+BUTTON_ACTIVE_COLORS = [DARK_BLUE, DARK_BLUE, DARK_BLUE, DARK_BLUE, DARK_BLUE, DARK_BLUE, DARK_GREEN]
 
 # Global objects that will be initialized later
 CAMERA_DISPLAY_RECT = None
@@ -74,13 +193,33 @@ piano_overlay_active = False
 keyboard_overlay_active = False
 calibration_mode = False
 manual_calibration_mode = False
+camera_color_order = "RGB"  # Channel order of processed camera frames (set by camera.py)
+
+def load_audio_profile(profile_file=AUDIO_PROFILE_FILE):
+    """Apply the buffer settings chosen by latency_probe.py, if a profile exists"""
+    global MIXER_BUFFER, MIXER_BLOCK_SIZE
+    
+    if not os.path.exists(profile_file):
+        return None
+    
+    try:
+        with open(profile_file, 'r') as f:
+            profile = json.load(f)
+        MIXER_BUFFER = int(profile["buffer"])
+        MIXER_BLOCK_SIZE = int(profile.get("block_size", MIXER_BUFFER))
+        print(f"Using audio profile: buffer {MIXER_BUFFER}, block {MIXER_BLOCK_SIZE}")
+        return profile
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring invalid audio profile {profile_file}: {e}")
+        return None
 
 def initialize_pygame():
     """Initialize pygame and return screen and clock objects"""
     global CAMERA_DISPLAY_RECT
     
+    load_audio_profile()
+    pygame.mixer.pre_init(frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS, buffer=MIXER_BUFFER)
     pygame.init()
-    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=1024)
     
     # Create display surface
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -95,6 +234,18 @@ def initialize_pygame():
     print("Pygame initialized successfully")
     return screen, clock
 
+# Font cache - SysFont lookups are slow, so each font is only built once
+fonts = {}
+
+def get_font(name, size, bold=False):
+    """Return a cached system font, creating it on first use"""
+    key = (name, size, bold)
+    font = fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(name, size, bold=bold)
+        fonts[key] = font
+    return font
+
 # Create buttons
 def create_buttons():
     """Create button objects for the UI"""
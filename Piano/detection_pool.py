@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# detection_pool.py - Hand detection in worker processes over shared-memory frames
+#
+# Detection's Python-level contour and defect loops hold the GIL against the
+# pygame main loop. With DETECTION_WORKERS > 0 the camera pipeline instead
+# copies each frame into a slot of a shared-memory ring and sends only the
+# (sequence, slot) pair to a worker process; no frame is ever pickled. Workers
+# write hand rectangles and fingertips into a small shared int32 result row per
+# slot. Results can finish out of order across workers, so they are held back
+# and handed out strictly in frame order.
+#
+# Measure scaling with:  python detection_pool.py --workers 1 2 4
+
+import os
+import sys
+import time
+import queue
+import argparse
+import multiprocessing
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+import config
+
+MAX_HANDS = 4
+MAX_FINGERTIPS = 32
+RESULT_INTS = 2 + MAX_HANDS * 4 + MAX_FINGERTIPS * 2  # hand count, fingertip count, rects, points
+
+def _worker_main(frames_name, results_name, frame_shape, num_slots, tasks, done):
+    """Worker process: detect hands in the slots it is given until told to stop"""
+    import hand_detection
+
+    frames_memory = shared_memory.SharedMemory(name=frames_name)
+    results_memory = shared_memory.SharedMemory(name=results_name)
+    frames = np.ndarray((num_slots,) + tuple(frame_shape), dtype=np.uint8, buffer=frames_memory.buf)
+    results = np.ndarray((num_slots, RESULT_INTS), dtype=np.int32, buffer=results_memory.buf)
+
+    detector = hand_detection.HandDetector()
+    try:
+        detector.load_cascade()
+    except Exception as e:
+        print(f"Detection worker could not load the hand cascade: {e}")
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            sequence, slot, lower_skin, upper_skin, color_order, region = task
+
+            # Calibration can change between frames, so it travels with each task
+            detector.set_skin_range(lower_skin, upper_skin)
+            config.camera_color_order = color_order
+
+            try:
+                hands, fingertips = detector.find_fingertips(frames[slot], region=region)
+            except Exception as e:
+                print(f"Error in detection worker: {e}")
+                hands, fingertips = [], []
+
+            row = results[slot]
+            hands = hands[:MAX_HANDS]
+            fingertips = fingertips[:MAX_FINGERTIPS]
+            row[0] = len(hands)
+            row[1] = len(fingertips)
+            if hands:
+                row[2:2 + len(hands) * 4] = np.asarray(hands, dtype=np.int32).ravel()
+            if fingertips:
+                start = 2 + MAX_HANDS * 4
+                row[start:start + len(fingertips) * 2] = np.asarray(fingertips, dtype=np.int32).ravel()
+            done.put((sequence, slot))
+    finally:
+        del frames, results
+        frames_memory.close()
+        results_memory.close()
+
+class DetectionPool:
+    """Worker processes detecting hands in frames passed through shared memory"""
+    def __init__(self, num_workers, frame_shape, num_slots=None):
+        self.num_workers = num_workers
+        self.frame_shape = tuple(frame_shape)
+        self.num_slots = num_slots or 2 * num_workers
+        frame_bytes = int(np.prod(self.frame_shape))
+
+        self.frames_memory = shared_memory.SharedMemory(create=True, size=self.num_slots * frame_bytes)
+        self.results_memory = shared_memory.SharedMemory(create=True, size=self.num_slots * RESULT_INTS * 4)
+        self.frames = np.ndarray((self.num_slots,) + self.frame_shape, dtype=np.uint8, buffer=self.frames_memory.buf)
+        self.results = np.ndarray((self.num_slots, RESULT_INTS), dtype=np.int32, buffer=self.results_memory.buf)
+
+        context = multiprocessing.get_context()
+        self.tasks = context.Queue()
+        self.done = context.Queue()
+        self.workers = [
+            context.Process(target=_worker_main, daemon=True, name=f"detection-{i}",
+                            args=(self.frames_memory.name, self.results_memory.name, self.frame_shape,
+                                  self.num_slots, self.tasks, self.done))
+            for i in range(num_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+        self.free_slots = deque(range(self.num_slots))
+        self.next_sequence = 0  # Given to the next submitted frame
+        self.deliver_sequence = 0  # Next result to hand back
+        self.finished = {}  # sequence -> slot, waiting for earlier frames
+
+        # Statistics
+        self.submitted = 0
+        self.skipped = 0  # Frames not submitted because every slot was busy
+        self.delivered = 0
+
+    def submit(self, frame, region=None):
+        """Copy a frame into a free slot and queue it, returning its sequence (None if all slots are busy)
+
+        region (x, y, w, h) limits the hand cascade to part of the frame.
+        """
+        if not self.free_slots:
+            self.skipped += 1
+            return None
+
+        import hand_detection
+        slot = self.free_slots.popleft()
+        np.copyto(self.frames[slot], frame)
+
+        sequence = self.next_sequence
+        self.next_sequence += 1
+        self.tasks.put((sequence, slot, tuple(int(v) for v in hand_detection.lower_skin),
+                        tuple(int(v) for v in hand_detection.upper_skin), config.camera_color_order, region))
+        self.submitted += 1
+        return sequence
+
+    def collect(self, timeout=0.0):
+        """Return finished results in frame order as (sequence, hands, fingertips) tuples"""
+        try:
+            # Wait for at most one result, then take whatever else is ready
+            if timeout > 0:
+                sequence, slot = self.done.get(timeout=timeout)
+                self.finished[sequence] = slot
+            while True:
+                sequence, slot = self.done.get_nowait()
+                self.finished[sequence] = slot
+        except queue.Empty:
+            pass
+
+        results = []
+        while self.deliver_sequence in self.finished:
+            slot = self.finished.pop(self.deliver_sequence)
+            results.append((self.deliver_sequence,) + self._read_result(slot))
+            self.free_slots.append(slot)
+            self.deliver_sequence += 1
+        self.delivered += len(results)
+        return results
+
+    def pending(self):
+        """Number of submitted frames whose results have not been handed back"""
+        return self.submitted - self.delivered
+
+    def _read_result(self, slot):
+        """Unpack one result row into (hand rects, fingertip points)"""
+        row = self.results[slot]
+        hand_count, tip_count = int(row[0]), int(row[1])
+        hands = [tuple(int(v) for v in row[2 + i * 4:6 + i * 4]) for i in range(hand_count)]
+        start = 2 + MAX_HANDS * 4
+        fingertips = [(int(row[start + i * 2]), int(row[start + i * 2 + 1])) for i in range(tip_count)]
+        return hands, fingertips
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        for _ in self.workers:
+            self.tasks.put(None)
+        for worker in self.workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+
+        del self.frames, self.results
+        self.frames_memory.close()
+        self.frames_memory.unlink()
+        self.results_memory.close()
+        self.results_memory.unlink()
+
+def _benchmark_frames(count, pacing="fast"):
+    """Render synthetic frames once so the benchmark measures detection only"""
+    import frame_sources
+    source = frame_sources.SyntheticSource(pacing=pacing)
+    return [source.read()[1].copy() for _ in range(count)]
+
+def run_benchmark(worker_counts, num_frames):
+    """Print detection throughput in-thread and with each worker count"""
+    import hand_detection
+
+    config.camera_color_order = "BGR"
+    frames = _benchmark_frames(num_frames)
+    print(f"Detection throughput on {num_frames} synthetic {frames[0].shape[1]}x{frames[0].shape[0]} frames "
+          f"({os.cpu_count()} CPUs)")
+
+    # The in-thread baseline uses a detector of its own, like each camera does
+    detector = hand_detection.HandDetector(hand_detection.take_cascade())
+    start_time = time.perf_counter()
+    for frame in frames:
+        detector.find_fingertips(frame)
+    baseline = num_frames / (time.perf_counter() - start_time)
+    print(f"{'in-thread':>10}: {baseline:8.1f} frames/s")
+
+    for num_workers in worker_counts:
+        detection_pool = DetectionPool(num_workers, frames[0].shape)
+        # Warm up: let every worker load its cascade before timing
+        for frame in frames[:num_workers]:
+            detection_pool.submit(frame)
+        while detection_pool.pending():
+            detection_pool.collect(timeout=1.0)
+
+        order = []
+        start_time = time.perf_counter()
+        next_frame = 0
+        while len(order) < num_frames:
+            while next_frame < num_frames and detection_pool.free_slots:
+                detection_pool.submit(frames[next_frame])
+                next_frame += 1
+            order.extend(result[0] for result in detection_pool.collect(timeout=1.0))
+        rate = num_frames / (time.perf_counter() - start_time)
+        detection_pool.close()
+
+        in_order = all(b == a + 1 for a, b in zip(order, order[1:]))
+        print(f"{num_workers:>3} worker{'s' if num_workers > 1 else ' '}: {rate:8.1f} frames/s "
+              f"({rate / baseline:.2f}x in-thread, results in order: {'yes' if in_order else 'NO'})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure hand detection throughput with worker processes")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to try")
+    parser.add_argument("--frames", type=int, default=200, help="Frames per measurement")
+    args = parser.parse_args()
+
+    if min(args.workers) < 1:
+        print("Worker counts must be at least 1")
+        sys.exit(1)
+    run_benchmark(args.workers, args.frames)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# effects.py - Streaming effects chain (convolution reverb and EQ) for the mixer engine
+#
+# Convolution uses a uniformly partitioned FFT overlap-add: the impulse
+# response is cut into block-sized partitions whose spectra are multiplied
+# with a delay line of past input spectra. Each block runs one small FFT pair
+# plus one spectrum multiply-add per partition, so every block costs the same
+# (no large FFTs, no uneven block times), but that cost grows linearly with
+# the number of partitions - IR length / block size. A 4s IR has eight times
+# the partitions of a 0.5s one, and costs roughly that much more per block
+# (see --benchmark).
+#
+# Benchmark with:  python effects.py --benchmark
+
+import sys
+import time
+import wave
+import argparse
+import numpy as np
+import config
+
+class PartitionedConvolver:
+    """Streams blocks through a long FIR filter with partitioned FFT overlap-add
+
+    The per-block cost is proportional to self.partitions (IR length / block size).
+    """
+    def __init__(self, impulse_response, block_size, channels):
+        ir = np.asarray(impulse_response, dtype=np.float32)
+        if ir.ndim == 1:
+            ir = ir[:, None]
+        if ir.shape[1] != channels:
+            ir = np.repeat(ir[:, :1], channels, axis=1)
+
+        self.block_size = block_size
+        self.channels = channels
+        self.fft_size = 2 * block_size
+        self.partitions = max(1, -(-len(ir) // block_size))
+
+        # Spectra of each IR partition: (partitions, channels, bins)
+        padded = np.zeros((self.partitions * block_size, channels), dtype=np.float32)
+        padded[:len(ir)] = ir
+        parts = padded.reshape(self.partitions, block_size, channels).transpose(0, 2, 1)
+        self.ir_spectra = np.fft.rfft(parts, n=self.fft_size, axis=2).astype(np.complex64)
+
+        # Frequency-domain delay line stored twice over, so the newest-to-oldest
+        # partitions are always one contiguous slice starting at head
+        bins = self.fft_size // 2 + 1
+        self.delay_line = np.zeros((2 * self.partitions, channels, bins), dtype=np.complex64)
+        self.head = 0
+        self.overlap = np.zeros((block_size, channels), dtype=np.float32)
+        self.input_buffer = np.zeros((channels, self.fft_size), dtype=np.float32)
+
+    def process(self, block):
+        """Convolve one (block_size, channels) block and return the filtered block"""
+        self.input_buffer[:, :self.block_size] = block.T
+        spectrum = np.fft.rfft(self.input_buffer, axis=1)
+
+        # Newest spectrum goes in front of the previous ones
+        self.head = (self.head - 1) % self.partitions
+        self.delay_line[self.head] = spectrum
+        self.delay_line[self.head + self.partitions] = spectrum
+
+        history = self.delay_line[self.head:self.head + self.partitions]
+        output = np.fft.irfft((history * self.ir_spectra).sum(axis=0), n=self.fft_size, axis=1)
+
+        # Overlap-add: first half is this block, second half carries into the next
+        result = output[:, :self.block_size].T + self.overlap
+        self.overlap[:] = output[:, self.block_size:].T
+        return result.astype(np.float32)
+
+class ConvolutionReverb:
+    """Convolution reverb with a dry/wet mix"""
+    def __init__(self, impulse_response, block_size, channels, wet=None):
+        self.wet = config.REVERB_WET if wet is None else wet
+        self.convolver = PartitionedConvolver(impulse_response, block_size, channels)
+
+    def process(self, block):
+        return block * (1.0 - self.wet) + self.convolver.process(block) * self.wet
+
+class Equalizer:
+    """Three-band EQ built as a short linear-phase FIR filter"""
+    def __init__(self, gains_db, crossovers_hz, frequency, block_size, channels, taps=255):
+        self.gains_db = gains_db
+        fft_size = 4096
+        freqs = np.fft.rfftfreq(fft_size, 1.0 / frequency)
+        low_cut, high_cut = crossovers_hz
+        gains = np.power(10.0, np.asarray(gains_db) / 20.0)
+
+        # Piecewise band gains with smooth (log-frequency) transitions
+        log_freqs = np.log2(np.maximum(freqs, 1.0))
+        low_weight = 1.0 / (1.0 + np.power(2.0, 4 * (log_freqs - np.log2(low_cut))))
+        high_weight = 1.0 / (1.0 + np.power(2.0, -4 * (log_freqs - np.log2(high_cut))))
+        mid_weight = 1.0 - low_weight - high_weight
+        response = gains[0] * low_weight + gains[1] * np.clip(mid_weight, 0, 1) + gains[2] * high_weight
+
+        # Frequency sampling design: centre the impulse and window it
+        impulse = np.roll(np.fft.irfft(response, n=fft_size), taps // 2)[:taps]
+        fir = (impulse * np.hanning(taps)).astype(np.float32)
+        self.convolver = PartitionedConvolver(fir, block_size, channels)
+
+    def process(self, block):
+        return self.convolver.process(block)
+
+class EffectsChain:
+    """Runs a block through a list of effects in order"""
+    def __init__(self, stages):
+        self.stages = stages
+        self.process_time = 0.0
+        self.blocks = 0
+
+    def process(self, block):
+        start_time = time.perf_counter()
+        for stage in self.stages:
+            block = stage.process(block)
+        self.process_time += time.perf_counter() - start_time
+        self.blocks += 1
+        return block
+
+def load_impulse_response(ir_file, frequency):
+    """Load a 16-bit WAV impulse response as a float array at the mixer frequency"""
+    with wave.open(ir_file, 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{ir_file}: only 16-bit WAV impulse responses are supported")
+        ir_rate = wav.getframerate()
+        ir = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+        ir = ir.reshape(-1, wav.getnchannels()).astype(np.float32) / 32768.0
+
+    if ir_rate != frequency:
+        # Linear resampling is plenty for a reverb tail
+        positions = np.arange(int(len(ir) * frequency / ir_rate)) * (ir_rate / frequency)
+        ir = np.stack([np.interp(positions, np.arange(len(ir)), ir[:, c]) for c in range(ir.shape[1])], axis=1)
+
+    # Normalise energy so swapping IRs does not change loudness much
+    energy = np.sqrt(np.sum(ir ** 2) / ir.shape[1])
+    return (ir / energy).astype(np.float32) if energy > 0 else ir
+
+def synthetic_impulse_response(seconds, frequency, channels, seed=0):
+    """Exponentially decaying noise, a stand-in for a room impulse response"""
+    rng = np.random.default_rng(seed)
+    frames = int(seconds * frequency)
+    decay = np.exp(-6.9 * np.arange(frames) / frames)[:, None]  # -60 dB at the end
+    ir = rng.standard_normal((frames, channels)).astype(np.float32) * decay
+    return ir / np.sqrt(np.sum(ir ** 2) / channels)
+
+def create_effects_chain(block_size, frequency, channels):
+    """Build the effects chain configured in config.py, or None if nothing is enabled"""
+    stages = []
+
+    if any(gain != 0.0 for gain in config.EQ_GAINS_DB):
+        stages.append(Equalizer(config.EQ_GAINS_DB, config.EQ_CROSSOVERS_HZ, frequency, block_size, channels))
+
+    if config.REVERB_IR_FILE:
+        try:
+            ir = load_impulse_response(config.REVERB_IR_FILE, frequency)
+            stages.append(ConvolutionReverb(ir, block_size, channels))
+            print(f"Loaded reverb impulse response {config.REVERB_IR_FILE} ({len(ir) / frequency:.2f}s)")
+        except (OSError, ValueError, wave.Error) as e:
+            print(f"Could not load impulse response {config.REVERB_IR_FILE}: {e}")
+
+    return EffectsChain(stages) if stages else None
+
+def run_benchmark(ir_seconds=(0.5, 1.0, 2.0, 4.0), block_sizes=(128, 256, 512, 1024),
+                  frequency=44100, channels=2, audio_seconds=5.0):
+    """Print the real-time factor of the reverb for each IR length and block size"""
+    print(f"Convolution reverb benchmark ({channels} channels, {frequency} Hz, {audio_seconds:.0f}s of audio)")
+    print("Real-time factor = processing time / audio time (lower is better, must stay below 1)")
+    print("Cost per block grows with the partition count (IR length / block size), shown in brackets")
+    print(f"{'IR length':>10} " + " ".join(f"{f'block {size}':>12}" for size in block_sizes))
+
+    rng = np.random.default_rng(1)
+    for seconds in ir_seconds:
+        ir = synthetic_impulse_response(seconds, frequency, channels)
+        row = []
+        for block_size in block_sizes:
+            reverb = ConvolutionReverb(ir, block_size, channels, wet=0.3)
+            block = rng.standard_normal((block_size, channels)).astype(np.float32)
+            blocks = int(audio_seconds * frequency / block_size)
+
+            start_time = time.perf_counter()
+            for _ in range(blocks):
+                reverb.process(block)
+            elapsed = time.perf_counter() - start_time
+
+            row.append((elapsed / (blocks * block_size / frequency), reverb.convolver.partitions))
+        print(f"{seconds:>9.1f}s " + " ".join(f"{rtf:>5.3f} ({partitions:>4})" for rtf, partitions in row))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Effects chain tools")
+    parser.add_argument("--benchmark", action="store_true", help="Report the reverb real-time factor")
+    parser.add_argument("--ir-seconds", type=float, nargs="+", default=[0.5, 1.0, 2.0, 4.0])
+    parser.add_argument("--blocks", type=int, nargs="+", default=[128, 256, 512, 1024])
+    parser.add_argument("--seconds", type=float, default=5.0, help="Audio processed per measurement")
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+        sys.exit(0)
+
+    run_benchmark(args.ir_seconds, args.blocks, audio_seconds=args.seconds)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# event_log.py - Non-blocking note event channel for terminal and stdout logging
+#
+# play_note and release_note only drop (timestamp, sound index, gain) into a
+# preallocated ring buffer; a release is logged with gain 0, like a MIDI
+# note-on at velocity 0. A low-priority consumer thread formats the events
+# and writes them to the terminal panel and stdout at a capped rate, so the
+# note trigger path does no string formatting or I/O. Session recordings get
+# their own append-only lists, so a full ring never drops a recorded note.
+
+import time
+import itertools
+import threading
+import config
+from terminal import add_terminal_message
+
+class EventRing:
+    """Fixed-size lock-free ring buffer of note events"""
+    # Producers claim a ticket from an atomic counter and publish the slot by
+    # writing its sequence number last, so several threads may push without a
+    # lock. The single consumer reads slots in ticket order. When the ring is
+    # full the oldest unread events are overwritten and counted as lost.
+    def __init__(self, size):
+        # Round up to a power of two so the slot is a cheap mask
+        self.size = 1 << max(1, (size - 1).bit_length())
+        self.mask = self.size - 1
+        self.times = [0.0] * self.size
+        self.values = [0] * self.size
+        self.gains = [0.0] * self.size
+        self.sequence = [0] * self.size  # ticket + 1 once a slot is written
+        self._tickets = itertools.count()
+        self.read_ticket = 0
+        self.lost = 0
+
+    def push(self, timestamp, value, gain=1.0):
+        """Publish an event (safe to call from any thread, never blocks)"""
+        ticket = next(self._tickets)
+        slot = ticket & self.mask
+        self.times[slot] = timestamp
+        self.values[slot] = value
+        self.gains[slot] = gain
+        self.sequence[slot] = ticket + 1
+
+    def pop(self, max_events):
+        """Return up to max_events (timestamp, value, gain) events in order (consumer only)"""
+        events = []
+        while len(events) < max_events:
+            slot = self.read_ticket & self.mask
+            sequence = self.sequence[slot]
+            if sequence <= self.read_ticket:
+                break  # Not written yet
+            if sequence > self.read_ticket + 1:
+                # Overwritten by a newer event before we got to it
+                self.lost += 1
+            else:
+                events.append((self.times[slot], self.values[slot], self.gains[slot]))
+            self.read_ticket += 1
+        return events
+
+# Global event channel
+note_events = EventRing(config.EVENT_LOG_SIZE)
+consumer_thread = None
+consumer_running = False
+events_logged = 0
+recordings = ()  # Append-only lists given every (timestamp, sound index, gain) event, never dropped
+
+def log_note(sound_idx, gain=1.0, timestamp=None):
+    """Record a note trigger for logging (hot path - no formatting or I/O)
+
+    timestamp is when the note sounds (perf_counter time), for notes scheduled
+    ahead; None means now.
+    """
+    if timestamp is None:
+        timestamp = time.perf_counter()
+    note_events.push(timestamp, sound_idx, gain)
+    for recording in recordings:
+        recording.append((timestamp, sound_idx, gain))
+    if consumer_thread is None:
+        start_event_log()
+
+def log_release(sound_idx, timestamp=None):
+    """Record a note release (logged as a note with gain 0)"""
+    log_note(sound_idx, 0.0, timestamp)
+
+def add_recording(recording):
+    """Append every note event to a list from now on
+
+    Unlike the ring, which overwrites events the logger has not read yet, a
+    recording gets every event (list.append is atomic, so any thread may log).
+    """
+    global recordings
+    recordings = recordings + (recording,)
+
+def remove_recording(recording):
+    """Stop appending note events to a list"""
+    global recordings
+    recordings = tuple(other for other in recordings if other is not recording)
+
+def start_event_log():
+    """Start the low-priority consumer thread"""
+    global consumer_thread, consumer_running
+
+    if consumer_thread is not None:
+        return
+    consumer_running = True
+    consumer_thread = threading.Thread(target=_consume_events, daemon=True)
+    consumer_thread.start()
+
+def stop_event_log():
+    """Stop the consumer thread after flushing what is queued"""
+    global consumer_thread, consumer_running
+
+    consumer_running = False
+    if consumer_thread is not None:
+        consumer_thread.join(timeout=1.0)
+        consumer_thread = None
+
+def _consume_events():
+    """Format queued note events at a capped rate"""
+    import piano
+
+    interval = 1.0 / config.EVENT_LOG_RATE_HZ
+    lost_reported = 0
+
+    while consumer_running:
+        time.sleep(interval)
+        _flush_events(piano)
+
+        if note_events.lost > lost_reported:
+            add_terminal_message(f"({note_events.lost - lost_reported} note events dropped from log)")
+            lost_reported = note_events.lost
+
+    _flush_events(piano)
+
+def _flush_events(piano):
+    """Write up to EVENT_LOG_LINES events, summarising the rest of the batch"""
+    global events_logged
+
+    events = note_events.pop(note_events.size)
+    if not events:
+        return
+
+    # Releases are not worth a terminal line
+    notes = [event for event in events if event[2] > 0.0]
+    for timestamp, sound_idx, gain in notes[:config.EVENT_LOG_LINES]:
+        add_terminal_message(f"Playing {piano.get_note_name(sound_idx)} (sound index {sound_idx})")
+
+    skipped = len(notes) - config.EVENT_LOG_LINES
+    if skipped > 0:
+        add_terminal_message(f"... and {skipped} more notes")
+    events_logged += len(events)
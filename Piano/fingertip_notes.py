@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# fingertip_notes.py - Turns fingertips from every camera into one stream of notes
+#
+# Each camera maps the fingertips inside its detection area onto a span of the
+# keyboard (its piano range) and reports the set of keys currently under a
+# finger. The stream merges those sets: a key sounds while any camera holds
+# it, so cameras with overlapping ranges never trigger a note twice, and a key
+# is released only when no camera holds it any more.
+
+from threading import Lock
+import config
+
+# Import these modules only when needed to avoid circular imports
+piano_module = None
+overlay_module = None
+
+def _import_modules():
+    """Import dependent modules only when needed"""
+    global piano_module, overlay_module
+    if piano_module is None:
+        import piano
+        piano_module = piano
+    if overlay_module is None:
+        import overlay
+        overlay_module = overlay
+
+def get_piano_span(notes=None):
+    """Get the (left, right) x span of the keyboard a camera plays, or None if it plays nothing"""
+    _import_modules()
+    if notes is not None:
+        return piano_module.get_key_span(*notes)
+
+    # Without a configured range the camera plays the keys under the piano overlay
+    left, right = overlay_module.get_piano_overlay_positions()
+    if not config.piano_overlay_active or left is None or right is None:
+        return None
+    return left, right
+
+def keys_for_fingertips(fingertips, region, span):
+    """Map fingertips inside a frame region (x, y, w, h) onto the keys of a keyboard span"""
+    _import_modules()
+    x, y, w, h = region
+    left, right = span
+    keys = set()
+    for fx, fy in fingertips:
+        if not (x <= fx < x + w and y <= fy < y + h):
+            continue
+        # Horizontal position picks the key; fingers near the top of the area reach the black keys
+        piano_x = left + (fx - x) / w * (right - left)
+        piano_y = config.PIANO_TOP + (fy - y) / h * config.PIANO_HEIGHT
+        key = piano_module.get_key_at((piano_x, piano_y))
+        if key is not None:
+            keys.add(key)
+    return keys
+
+class NoteStream:
+    """Merges the keys held by each camera into note on/off events"""
+    def __init__(self):
+        self.lock = Lock()
+        self.held = {}  # camera id -> set of (key index, is black)
+        self.sounding = set()
+
+        # Statistics
+        self.notes_played = 0
+        self.notes_by_camera = {}
+
+    def update(self, camera_id, keys):
+        """Set the keys one camera currently holds and play or release what changed"""
+        _import_modules()
+        with self.lock:
+            if keys == self.held.get(camera_id, set()):
+                return
+            self.held[camera_id] = set(keys)
+            merged = set().union(*self.held.values())
+            started = merged - self.sounding
+            stopped = self.sounding - merged
+            self.sounding = merged
+
+            for note_idx, is_black in started:
+                piano_module.play_note(note_idx, is_black)
+                self._set_key(note_idx, is_black, True)
+            for note_idx, is_black in stopped:
+                piano_module.release_note(note_idx, is_black)
+                self._set_key(note_idx, is_black, False)
+            self.notes_played += len(started)
+            self.notes_by_camera[camera_id] = self.notes_by_camera.get(camera_id, 0) + len(started)
+
+    def clear(self, camera_id):
+        """Release everything a camera holds (e.g. when it stops)"""
+        self.update(camera_id, set())
+        with self.lock:
+            self.held.pop(camera_id, None)
+
+    def _set_key(self, note_idx, is_black, active):
+        """Light or clear a key on the on-screen piano"""
+        keys = piano_module.active_black_keys if is_black else piano_module.active_white_keys
+        if note_idx < len(keys):
+            keys[note_idx] = active
+
+# Shared by every camera
+note_stream = NoteStream()
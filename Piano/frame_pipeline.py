@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# frame_pipeline.py - Declarative frame-processing pipeline with per-stage timing
+#
+# A pipeline is an ordered list of named stages. Each stage is a function that
+# works on a FrameContext (the frame plus anything earlier stages produced).
+# Stages can be reordered, disabled or swapped at runtime, and a stage with a
+# predicate only runs while the predicate holds, so optional modes such as
+# calibration cost a single check when they are off. Every stage records its
+# wall time in a rolling window that reports p50/p95/p99.
+
+import time
+import threading
+import numpy as np
+import config
+
+class RollingTimer:
+    """Keeps the last N durations of a stage and reports percentiles"""
+    def __init__(self, size=None):
+        self.samples = np.zeros(size or config.PIPELINE_TIMING_WINDOW, dtype=np.float64)
+        self.index = 0
+        self.count = 0
+
+    def record(self, seconds):
+        """Add one duration"""
+        self.samples[self.index] = seconds
+        self.index = (self.index + 1) % len(self.samples)
+        self.count += 1
+
+    def percentiles(self):
+        """Return (p50, p95, p99) in milliseconds over the rolling window"""
+        filled = self.samples[:min(self.count, len(self.samples))]
+        if len(filled) == 0:
+            return 0.0, 0.0, 0.0
+        p50, p95, p99 = np.percentile(filled, [50, 95, 99]) * 1000
+        return p50, p95, p99
+
+class FrameContext:
+    """State passed through the stages for one frame (reused between frames)"""
+    def __init__(self, **values):
+        self.frame = None
+        self.fingertips = []
+        self.__dict__.update(values)
+
+class Stage:
+    """One named step of a pipeline"""
+    def __init__(self, name, function, predicate=None, enabled=True, critical=False):
+        self.name = name
+        self.function = function  # function(context), updates the context in place
+        self.predicate = predicate  # predicate(context) -> bool, or None to always run
+        self.enabled = enabled
+        self.critical = critical  # An error in a critical stage drops the frame
+        self.timer = RollingTimer()
+        self.errors = 0
+
+class Pipeline:
+    """Ordered list of stages run on every frame"""
+    def __init__(self, stages=None):
+        self.stages = list(stages or [])
+        self.lock = threading.Lock()  # Guards changes made from the UI thread
+
+    def _find(self, name):
+        for i, stage in enumerate(self.stages):
+            if stage.name == name:
+                return i
+        raise KeyError(f"No pipeline stage named '{name}'")
+
+    def get(self, name):
+        """Return the stage with this name"""
+        return self.stages[self._find(name)]
+
+    def add(self, stage, before=None, after=None):
+        """Insert a stage at the end, or before/after a named stage"""
+        with self.lock:
+            stages = list(self.stages)
+            if before is not None:
+                stages.insert(self._find(before), stage)
+            elif after is not None:
+                stages.insert(self._find(after) + 1, stage)
+            else:
+                stages.append(stage)
+            self.stages = stages
+
+    def remove(self, name):
+        """Remove a stage and return it"""
+        with self.lock:
+            stages = list(self.stages)
+            stage = stages.pop(self._find(name))
+            self.stages = stages
+        return stage
+
+    def replace(self, name, stage):
+        """Swap a stage for another one in the same position"""
+        with self.lock:
+            stages = list(self.stages)
+            stages[self._find(name)] = stage
+            self.stages = stages
+
+    def move(self, name, index):
+        """Move a stage to a new position"""
+        with self.lock:
+            stages = list(self.stages)
+            stage = stages.pop(self._find(name))
+            stages.insert(index, stage)
+            self.stages = stages
+
+    def set_enabled(self, name, enabled):
+        """Turn a stage on or off"""
+        self.get(name).enabled = enabled
+
+    def run(self, context):
+        """Run every active stage on a frame; returns False if the frame was dropped"""
+        # Changes swap in a new list, so iterating the current one is safe without the lock
+        for stage in self.stages:
+            if not stage.enabled or (stage.predicate is not None and not stage.predicate(context)):
+                continue
+
+            start_time = time.perf_counter()
+            try:
+                stage.function(context)
+            except Exception as e:
+                stage.errors += 1
+                print(f"Error in {stage.name} stage: {e}")
+                if stage.critical:
+                    return False
+            finally:
+                stage.timer.record(time.perf_counter() - start_time)
+        return True
+
+    def get_timings(self):
+        """Return {stage name: {"runs", "p50", "p95", "p99", "errors"}} with times in ms"""
+        timings = {}
+        for stage in self.stages:
+            p50, p95, p99 = stage.timer.percentiles()
+            timings[stage.name] = {"runs": stage.timer.count, "p50": p50, "p95": p95, "p99": p99,
+                                   "errors": stage.errors}
+        return timings
+
+    def format_timings(self):
+        """Return one line per stage that has run, for the terminal or stdout"""
+        lines = []
+        for name, timing in self.get_timings().items():
+            if timing["runs"]:
+                lines.append(f"{name}: p50 {timing['p50']:.2f}ms, p95 {timing['p95']:.2f}ms, "
+                             f"p99 {timing['p99']:.2f}ms ({timing['runs']} runs)")
+        return lines
@@ -1,16 +1,33 @@
 #!/usr/bin/env python3
 # hand_detection.py - Handles hand detection and fingertip tracking
 
+import sys
+import time
+import argparse
 import cv2
 import numpy as np
 import urllib.request
+import weakref
+from collections import deque
+import config
 from terminal import add_terminal_message
 
-# Global variables for hand detection
-hand_cascade = None
+# Calibrated skin range, the starting range of every detector
 lower_skin = np.array([0, 20, 70], dtype=np.uint8)
 upper_skin = np.array([20, 255, 255], dtype=np.uint8)
 
+# cvtColor codes from the camera frame's channel order
+COLOR_CONVERSIONS = {
+    ("RGB", "gray"): cv2.COLOR_RGB2GRAY,
+    ("BGR", "gray"): cv2.COLOR_BGR2GRAY,
+    ("RGB", "hsv"): cv2.COLOR_RGB2HSV,
+    ("BGR", "hsv"): cv2.COLOR_BGR2HSV
+}
+
+def get_color_conversion(target):
+    """Get the cvtColor code converting camera frames to gray or HSV"""
+    return COLOR_CONVERSIONS[(config.camera_color_order, target)]
+
 def download_hand_cascade():
     """Download the hand cascade XML if needed"""
     url = "https://raw.githubusercontent.com/Balaje/OpenCV/master/haarcascades/hand.xml"
@@ -32,55 +49,181 @@ def download_hand_cascade():
         add_terminal_message(f"Error downloading hand cascade: {e}")
         return None
 
-def initialize_hand_detector():
-    """Initialize the hand detector with cascade classifier"""
-    global hand_cascade
+def load_cascade_classifier(cascade_file=None):
+    """Load a hand cascade classifier (downloading hand.xml if needed), returning None on failure"""
+    cascade_file = cascade_file or download_hand_cascade()
+    if not cascade_file:
+        return None
+    try:
+        return cv2.CascadeClassifier(cascade_file)
+    except (AttributeError, cv2.error) as e:
+        add_terminal_message(f"Could not load the hand cascade: {e}")
+        return None
+
+def preload_cascades(count=1):
+    """Load classifiers ahead of time for the next detectors, returning False if loading failed
     
-    cascade_file = download_hand_cascade()
-    if cascade_file:
-        hand_cascade = cv2.CascadeClassifier(cascade_file)
-        add_terminal_message("Hand detector initialized")
-        return hand_cascade
-    return None
+    A classifier is not safe to use from two threads at once, so each detector
+    takes one of its own (see take_cascade) instead of sharing.
+    """
+    while len(_preloaded_cascades) < count:
+        cascade = load_cascade_classifier()
+        if cascade is None:
+            return False
+        _preloaded_cascades.append(cascade)
+    return True
 
-def detect_fingertips(frame):
-    """Detect fingertips in the camera frame"""
-    global hand_cascade, lower_skin, upper_skin
+def take_cascade():
+    """Return a preloaded classifier for a new detector, loading one now if none is left"""
+    try:
+        return _preloaded_cascades.popleft()
+    except IndexError:
+        return load_cascade_classifier()
+
+class HandDetector:
+    """Hand and fingertip detection with its own cascade, skin range and reusable buffers
     
-    # If hand detector not initialized, try to initialize
-    if hand_cascade is None:
-        hand_cascade = initialize_hand_detector()
-        if hand_cascade is None:
-            return frame, []
+    Every image a frame needs (gray, the downscaled pyramid levels, HSV and the
+    skin masks) is kept between calls and only reallocated when the frame or
+    region size changes, so steady-state detection allocates almost nothing.
+    A detector is not thread-safe; give each camera its own.
+    """
+    def __init__(self, cascade=None, cascade_file=None, lower=None, upper=None):
+        self.cascade_file = cascade_file  # None = the downloaded hand.xml
+        self.cascade = cascade  # An already loaded classifier, or None to load on first use
+        self.load_failed = False  # Don't retry (and log) a failed load on every frame
+        self.lower_skin = np.array(lower_skin if lower is None else lower, dtype=np.uint8)
+        self.upper_skin = np.array(upper_skin if upper is None else upper, dtype=np.uint8)
+        self.kernel = np.ones((3, 3), np.uint8)
+        self.buffers = {}
+        
+        # Statistics
+        self.allocations = 0  # Buffers (re)allocated
+        
+        _detectors.add(self)
     
-    # Convert to grayscale for Haar cascade
-    gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+    def load_cascade(self):
+        """Load the cascade classifier, returning it or None"""
+        self.cascade = load_cascade_classifier(self.cascade_file)
+        self.load_failed = self.cascade is None
+        if self.cascade is not None:
+            add_terminal_message("Hand detector initialized")
+        return self.cascade
     
-    # Apply Gaussian blur to reduce noise
-    blur = cv2.GaussianBlur(gray, (5, 5), 0)
+    def set_skin_range(self, lower, upper):
+        """Set the HSV skin range (lower, upper) used for fingertips"""
+        self.lower_skin, self.upper_skin = np.array(lower, dtype=np.uint8), np.array(upper, dtype=np.uint8)
     
-    # Detect hands using Haar cascade
-    hands = hand_cascade.detectMultiScale(gray, 1.3, 5)
+    def _buffer(self, name, shape):
+        """Return the named buffer, (re)allocating it if its shape changed"""
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = self.buffers[name] = np.empty(shape, dtype=np.uint8)
+            self.allocations += 1
+        return buffer
     
-    fingertips = []
+    def detect_fingertips(self, frame):
+        """Detect fingertips in the camera frame and draw them"""
+        hands, fingertips = self.find_fingertips(frame)
+        draw_detections(frame, hands, fingertips)
+        return frame, fingertips
     
-    for (x, y, w, h) in hands:
-        # Draw rectangle around detected hand
-        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+    def find_fingertips(self, frame, settings=None, hands=None, region=None):
+        """Find hands and fingertips without drawing, returning (hand rects, fingertip points)
+        
+        settings is a quality level from config.DETECTION_QUALITY_LEVELS (None for the
+        default); passing the hand rects of an earlier frame skips the cascade. region
+        (x, y, w, h) limits the cascade to part of the frame. Results are always in
+        full-frame coordinates.
+        """
+        if hands is None:
+            hands = self.detect_hands(frame, settings, region)
+        
+        fingertips = []
+        for (x, y, w, h) in hands:
+            fingertips.extend(self.find_hand_fingertips(frame, x, y, w, h))
+        return hands, fingertips
+    
+    def detect_hands(self, frame, settings=None, region=None):
+        """Run the hand cascade (on a region of the frame if given), returning hand rects in frame coordinates"""
+        # If hand detector not initialized, try to initialize
+        if self.cascade is None and (self.load_failed or self.load_cascade() is None):
+            return []
+        
+        settings = settings or config.DETECTION_QUALITY_LEVELS[config.DETECTION_START_LEVEL]
+        
+        # Hand size limits come from the full frame, so they mean the same with or without a region
+        min_size, max_size = get_hand_size_limits(frame.shape[1])
+        
+        # Crop to the region (a view, nothing is copied) and shift the rects back afterwards
+        offset_x = offset_y = 0
+        if region is not None:
+            offset_x, offset_y, width, height = region
+            frame = frame[offset_y:offset_y+height, offset_x:offset_x+width]
+        
+        # Convert to grayscale for Haar cascade
+        gray = cv2.cvtColor(frame, get_color_conversion("gray"), dst=self._buffer("gray", frame.shape[:2]))
+        
+        # Search a smaller image (the configured detection scale times the quality level's)
+        gray = self._downscale(gray, config.DETECTION_SCALE * settings["scale"])
+        scale_x = frame.shape[1] / float(gray.shape[1])
+        scale_y = frame.shape[0] / float(gray.shape[0])
+        
+        # Detect hands using Haar cascade, with the size limits shrunk to the searched image
+        min_size = (int(min_size / scale_x), int(min_size / scale_y)) if min_size else (0, 0)
+        max_size = (int(max_size / scale_x), int(max_size / scale_y)) if max_size else (0, 0)
+        hands = self.cascade.detectMultiScale(gray, settings["scale_factor"], settings["min_neighbors"],
+                                              minSize=min_size, maxSize=max_size)
+        
+        # Scale the rects back to full resolution for the contour analysis
+        return [(int(round(x * scale_x)) + offset_x, int(round(y * scale_y)) + offset_y,
+                 int(round(w * scale_x)), int(round(h * scale_y))) for (x, y, w, h) in hands]
+    
+    def _downscale(self, gray, scale):
+        """Shrink a grayscale image by scale, halving step by step like an image pyramid
+        
+        Each halving is a 2x2 area average, which is much cheaper than one large
+        INTER_AREA resize and smooths the image as it goes; any remaining factor
+        (e.g. 0.75) is a single resize at the end.
+        """
+        level = 0
+        while scale <= 0.5:
+            level += 1
+            size = ((gray.shape[1] + 1) // 2, (gray.shape[0] + 1) // 2)
+            gray = cv2.resize(gray, size, dst=self._buffer(f"pyramid{level}", (size[1], size[0])),
+                              interpolation=cv2.INTER_AREA)
+            scale *= 2
+        if scale < 1.0:
+            size = (max(1, int(round(gray.shape[1] * scale))), max(1, int(round(gray.shape[0] * scale))))
+            gray = cv2.resize(gray, size, dst=self._buffer("scaled", (size[1], size[0])),
+                              interpolation=cv2.INTER_AREA)
+        return gray
+    
+    def find_hand_fingertips(self, frame, x, y, w, h):
+        """Find fingertips inside one hand rect, in frame coordinates"""
+        fingertips = []
         
         # Extract hand region for contour analysis
         hand_region = frame[y:y+h, x:x+w]
+        height, width = hand_region.shape[:2]
+        if height == 0 or width == 0:
+            return fingertips
+        
+        # The buffers are sized to the frame, each hand uses the top-left corner of them
+        frame_height, frame_width = frame.shape[:2]
+        hsv = self._buffer("hsv", (frame_height, frame_width, 3))[:height, :width]
+        mask = self._buffer("mask", (frame_height, frame_width))[:height, :width]
+        dilated = self._buffer("dilated", (frame_height, frame_width))[:height, :width]
         
         # Convert to HSV for better skin detection
-        hsv = cv2.cvtColor(hand_region, cv2.COLOR_RGB2HSV)
+        cv2.cvtColor(hand_region, get_color_conversion("hsv"), dst=hsv)
         
         # Create mask for skin color using calibrated values
-        mask = cv2.inRange(hsv, lower_skin, upper_skin)
+        cv2.inRange(hsv, self.lower_skin, self.upper_skin, dst=mask)
         
         # Apply morphological operations to clean up the mask
-        kernel = np.ones((3, 3), np.uint8)
-        mask = cv2.dilate(mask, kernel, iterations=2)
-        mask = cv2.erode(mask, kernel, iterations=2)
+        cv2.dilate(mask, self.kernel, dst=dilated, iterations=2)
+        cv2.erode(dilated, self.kernel, dst=mask, iterations=2)
         
         # Find contours
         contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -89,9 +232,6 @@ def detect_fingertips(frame):
             # Find largest contour (assume it's the hand)
             largest_contour = max(contours, key=cv2.contourArea)
             
-            # Create convex hull around hand
-            hull = cv2.convexHull(largest_contour)
-            
             # Find convexity defects
             hull_indices = cv2.convexHull(largest_contour, returnPoints=False)
             
@@ -99,57 +239,329 @@ def detect_fingertips(frame):
                 defects = cv2.convexityDefects(largest_contour, hull_indices)
                 
                 if defects is not None:
-                    # Find fingertips using convexity defects
-                    for i in range(defects.shape[0]):
-                        s, e, f, d = defects[i, 0]
-                        start = tuple(largest_contour[s][0])
-                        end = tuple(largest_contour[e][0])
-                        far = tuple(largest_contour[f][0])
-                        
-                        # Calculate distance between points
-                        a = np.sqrt((end[0] - start[0]) ** 2 + (end[1] - start[1]) ** 2)
-                        b = np.sqrt((far[0] - start[0]) ** 2 + (far[1] - start[1]) ** 2)
-                        c = np.sqrt((end[0] - far[0]) ** 2 + (end[1] - far[1]) ** 2)
-                        
-                        # Calculate angle
-                        angle = np.arccos((b ** 2 + c ** 2 - a ** 2) / (2 * b * c)) * 180 / np.pi
-                        
-                        # Fingertips typically have angles less than 90 degrees
-                        if angle <= 90:
-                            # Add fingertip to the list (relative to full frame)
-                            fingertips.append((x + end[0], y + end[1]))
-                            
-                            # Draw a green square around the fingertip
-                            square_size = 10
-                            pt1 = (x + end[0] - square_size // 2, y + end[1] - square_size // 2)
-                            pt2 = (x + end[0] + square_size // 2, y + end[1] + square_size // 2)
-                            cv2.rectangle(frame, pt1, pt2, (0, 255, 0), 2)
-            except:
+                    # Find fingertips using convexity defects (relative to full frame)
+                    tips = fingertips_from_defects(largest_contour, defects) + (x, y)
+                    fingertips.extend(map(tuple, tips.tolist()))
+            except cv2.error:
                 # Sometimes convexityDefects can fail if the contour is too simple
                 pass
             
-            # Also mark the extreme points as potential fingertips
+            # Also mark the extreme top point as a potential fingertip
             # (helps catch extended single fingers)
-            extLeft = tuple(largest_contour[largest_contour[:, :, 0].argmin()][0])
-            extRight = tuple(largest_contour[largest_contour[:, :, 0].argmax()][0])
-            extTop = tuple(largest_contour[largest_contour[:, :, 1].argmin()][0])
-            
-            # Add extreme top point as potential fingertip
-            fingertips.append((x + extTop[0], y + extTop[1]))
-            
-            # Draw green square around it
-            square_size = 10
-            pt1 = (x + extTop[0] - square_size // 2, y + extTop[1] - square_size // 2)
-            pt2 = (x + extTop[0] + square_size // 2, y + extTop[1] + square_size // 2)
-            cv2.rectangle(frame, pt1, pt2, (0, 255, 0), 2)
+            ext_top = largest_contour[largest_contour[:, :, 1].argmin()][0]
+            fingertips.append((x + int(ext_top[0]), y + int(ext_top[1])))
+        
+        return fingertips
+
+def get_hand_size_limits(frame_width):
+    """Get the (min, max) hand size in pixels for a frame width from config (0 = no limit)"""
+    min_size = int(config.HAND_MIN_SIZE * frame_width) if config.HAND_MIN_SIZE else 0
+    max_size = int(config.HAND_MAX_SIZE * frame_width) if config.HAND_MAX_SIZE else 0
+    return min_size, max_size
+
+def rect_overlap(a, b):
+    """Intersection over union of two (x, y, w, h) rects"""
+    left, top = max(a[0], b[0]), max(a[1], b[1])
+    right, bottom = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    if right <= left or bottom <= top:
+        return 0.0
+    intersection = (right - left) * (bottom - top)
+    return intersection / float(a[2] * a[3] + b[2] * b[3] - intersection)
+
+def fingertips_from_defects(contour, defects, min_depth=None):
+    """Return the defect end points that look like fingertips as an (N, 2) array in contour coordinates
+    
+    Every defect is handled at once: the triangle start-end-far gives the angle at
+    the far point, and narrow angles (and, optionally, deep enough defects) mark fingertips.
+    """
+    min_depth = config.FINGERTIP_MIN_DEFECT_DEPTH if min_depth is None else min_depth
+    points = contour.reshape(-1, 2)
+    defects = defects.reshape(-1, 4)
+    start = points[defects[:, 0]].astype(np.float64)
+    end = points[defects[:, 1]].astype(np.float64)
+    far = points[defects[:, 2]].astype(np.float64)
+    
+    # Side lengths of each triangle
+    a = np.sqrt(((end - start) ** 2).sum(axis=1))
+    b = np.sqrt(((far - start) ** 2).sum(axis=1))
+    c = np.sqrt(((end - far) ** 2).sum(axis=1))
     
-    return frame, fingertips
+    # Angle at the far point (degenerate triangles give NaN, which never passes the test)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        angle = np.arccos((b ** 2 + c ** 2 - a ** 2) / (2 * b * c)) * 180 / np.pi
+    
+    # Fingertips typically have angles less than 90 degrees
+    keep = angle <= 90
+    if min_depth:
+        keep &= defects[:, 3] >= min_depth * 256  # Depth is fixed point with 8 fractional bits
+    return points[defects[keep, 1]]
+
+def draw_detections(frame, hands, fingertips):
+    """Draw a rectangle around each hand and a green square on each fingertip"""
+    for (x, y, w, h) in hands:
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+    
+    if len(fingertips) == 0:
+        return
+    
+    # All squares go to OpenCV in one call instead of one rectangle each
+    half = 10 // 2
+    corners = np.array([(-half, -half), (half, -half), (half, half), (-half, half)], dtype=np.int32)
+    squares = np.asarray(fingertips, dtype=np.int32)[:, None, :] + corners
+    cv2.polylines(frame, squares, True, (0, 255, 0), 2)
+
+# Every detector, so calibration reaches all of them
+_detectors = weakref.WeakSet()
+
+# Classifiers loaded ahead of time (e.g. by the warm-up), handed out one per detector
+_preloaded_cascades = deque()
+
+# The detector behind the module-level functions
+default_detector = HandDetector()
+
+def initialize_hand_detector():
+    """Initialize the default hand detector with its cascade classifier"""
+    return default_detector.load_cascade()
+
+def detect_fingertips(frame):
+    """Detect fingertips in the camera frame"""
+    return default_detector.detect_fingertips(frame)
+
+def find_fingertips(frame, settings=None, hands=None, region=None):
+    """Find hands and fingertips with the default detector (see HandDetector.find_fingertips)"""
+    return default_detector.find_fingertips(frame, settings, hands, region)
+
+def detect_hands(frame, settings=None, region=None):
+    """Run the default detector's hand cascade, returning hand rects in frame coordinates"""
+    return default_detector.detect_hands(frame, settings, region)
+
+def find_hand_fingertips(frame, x, y, w, h):
+    """Find fingertips inside one hand rect with the default detector"""
+    return default_detector.find_hand_fingertips(frame, x, y, w, h)
 
 def update_skin_range(min_h, max_h, min_s, max_s, min_v, max_v):
-    """Update the skin color range for detection"""
+    """Update the skin color range for detection (in every detector)"""
     global lower_skin, upper_skin
     
     lower_skin = np.array([min_h, min_s, min_v], dtype=np.uint8)
     upper_skin = np.array([max_h, max_s, max_v], dtype=np.uint8)
+    for detector in list(_detectors):
+        detector.set_skin_range(lower_skin, upper_skin)
+    
+    add_terminal_message(f"Skin range updated: H:{min_h}-{max_h}, S:{min_s}-{max_s}, V:{min_v}-{max_v}")
+
+def _noisy_hand_contour(num_spikes, seed=1):
+    """Build the largest contour of a jagged blob (like a noisy skin mask) and its defects"""
+    rng = np.random.default_rng(seed)
+    size = max(480, num_spikes * 8)  # Room for every spike to survive rasterising
+    angles = np.linspace(0, 2 * np.pi, num_spikes * 2, endpoint=False)
+    inner = 0.3 * rng.uniform(0.8, 1.2, num_spikes * 2)
+    radii = np.where(np.arange(num_spikes * 2) % 2 == 0, 0.45, inner) * size
+    polygon = np.stack([size / 2 + radii * np.cos(angles), size / 2 + radii * np.sin(angles)], axis=1)
+    
+    mask = np.zeros((size, size), dtype=np.uint8)
+    cv2.fillPoly(mask, [polygon.astype(np.int32)], 255)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    contour = max(contours, key=cv2.contourArea)
+    defects = cv2.convexityDefects(contour, cv2.convexHull(contour, returnPoints=False))
+    return contour, defects
+
+def _fingertips_from_defects_loop(contour, defects):
+    """The per-defect Python loop fingertips_from_defects replaced (kept for the benchmark)"""
+    fingertips = []
+    defects = defects.reshape(-1, 1, 4)
+    for i in range(defects.shape[0]):
+        s, e, f, d = defects[i, 0]
+        start = tuple(contour[s][0])
+        end = tuple(contour[e][0])
+        far = tuple(contour[f][0])
+        a = np.sqrt((end[0] - start[0]) ** 2 + (end[1] - start[1]) ** 2)
+        b = np.sqrt((far[0] - start[0]) ** 2 + (far[1] - start[1]) ** 2)
+        c = np.sqrt((end[0] - far[0]) ** 2 + (end[1] - far[1]) ** 2)
+        angle = np.arccos((b ** 2 + c ** 2 - a ** 2) / (2 * b * c)) * 180 / np.pi
+        if angle <= 90:
+            fingertips.append(end)
+    return fingertips
+
+def run_benchmark(spike_counts=(50, 200, 500), repeats=200):
+    """Time fingertip extraction and drawing per contour, per-defect loop vs batched"""
+    print(f"Fingertip extraction on jagged contours (mean of {repeats} runs)")
+    print(f"{'defects':>8} {'loop':>10} {'batched':>10} {'speedup':>8} {'draw loop':>10} {'draw batch':>11} {'same':>5}")
+    frame = np.zeros((max(480, max(spike_counts) * 8),) * 2 + (3,), dtype=np.uint8)
+    
+    for num_spikes in spike_counts:
+        contour, defects = _noisy_hand_contour(num_spikes)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            start_time = time.perf_counter()
+            for _ in range(repeats):
+                loop_tips = _fingertips_from_defects_loop(contour, defects)
+            loop_time = (time.perf_counter() - start_time) / repeats
+        
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            tips = fingertips_from_defects(contour, defects, min_depth=0)
+        batch_time = (time.perf_counter() - start_time) / repeats
+        
+        # Drawing: one rectangle per fingertip vs one polylines call
+        tip_list = list(map(tuple, tips.tolist()))
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            for (fx, fy) in tip_list:
+                cv2.rectangle(frame, (fx - 5, fy - 5), (fx + 5, fy + 5), (0, 255, 0), 2)
+        draw_loop_time = (time.perf_counter() - start_time) / repeats
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            draw_detections(frame, [], tip_list)
+        draw_batch_time = (time.perf_counter() - start_time) / repeats
+        
+        same = [tuple(int(v) for v in tip) for tip in loop_tips] == tip_list
+        print(f"{len(defects):>8} {loop_time * 1000:>8.3f}ms {batch_time * 1000:>8.3f}ms {loop_time / batch_time:>7.1f}x "
+              f"{draw_loop_time * 1000:>8.3f}ms {draw_batch_time * 1000:>9.3f}ms {'yes' if same else 'NO':>5}")
+
+def run_allocation_benchmark(num_frames=200):
+    """Measure memory allocated per frame by a detector with fresh vs reused buffers"""
+    import tracemalloc
+    import frame_sources
+    
+    source = frame_sources.SyntheticSource(pacing="fast")
+    frames = [source.read()[1].copy() for _ in range(num_frames)]
+    # The cascade rarely fires on the synthetic hand, so the skin blob gives the hand rect
+    detector = HandDetector()
+    hands = []
+    for frame in frames:
+        mask = cv2.inRange(cv2.cvtColor(frame, cv2.COLOR_BGR2HSV), detector.lower_skin, detector.upper_skin)
+        hands.append([cv2.boundingRect(mask)])
+    
+    config.camera_color_order = "BGR"
+    print(f"Allocations per frame on {num_frames} synthetic {frames[0].shape[1]}x{frames[0].shape[0]} frames "
+          f"(cascade at scale {config.DETECTION_SCALE} and fingertips of one hand)")
+    print(f"{'buffers':>8} {'per frame':>10} {'allocated':>12} {'buffer allocs':>14}")
+    for reuse in (False, True):
+        detector.buffers.clear()
+        detector.detect_hands(frames[0])
+        detector.find_fingertips(frames[0], hands=hands[0])
+        detector.allocations = 0
+        
+        tracemalloc.start()
+        allocated = 0
+        start_time = time.perf_counter()
+        for frame, frame_hands in zip(frames, hands):
+            if not reuse:
+                detector.buffers.clear()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            detector.detect_hands(frame)
+            detector.find_fingertips(frame, hands=frame_hands)
+            allocated += tracemalloc.get_traced_memory()[1] - baseline
+        elapsed = (time.perf_counter() - start_time) / num_frames
+        tracemalloc.stop()
+        
+        print(f"{'reused' if reuse else 'fresh':>8} {elapsed * 1000:>8.2f}ms {allocated / num_frames / 1024:>9.1f} KB "
+              f"{detector.allocations / num_frames:>14.2f}")
+
+def _match_hands(reference, found, min_overlap=0.5):
+    """Count found rects matching a reference rect (IoU >= min_overlap), returning (matches, summed IoU)"""
+    unmatched = list(found)
+    matches, total_overlap = 0, 0.0
+    for rect in reference:
+        best = max(unmatched, key=lambda other: rect_overlap(rect, other), default=None)
+        if best is not None and rect_overlap(rect, best) >= min_overlap:
+            unmatched.remove(best)
+            matches += 1
+            total_overlap += rect_overlap(rect, best)
+    return matches, total_overlap
+
+def run_scale_report(frames, scales=(1.0, 0.5, 0.25), repeats=3):
+    """Time the cascade at each detection scale on recorded frames and compare its hands with full resolution
+    
+    The full-resolution cascade is the reference: recall is the share of its hands
+    found again at the lower scale, precision the share of lower-scale hands it agrees with.
+    """
+    settings = dict(config.DETECTION_QUALITY_LEVELS[config.DETECTION_START_LEVEL], scale=1.0)
+    saved_scale = config.DETECTION_SCALE
+    results = {}
+    try:
+        for scale in sorted(set(scales) | {1.0}, reverse=True):
+            config.DETECTION_SCALE = scale
+            detect_hands(frames[0], settings)  # Loads the cascade outside the timing
+            start_time = time.perf_counter()
+            for _ in range(repeats):
+                hands = [detect_hands(frame, settings) for frame in frames]
+            results[scale] = ((time.perf_counter() - start_time) / (repeats * len(frames)), hands)
+    finally:
+        config.DETECTION_SCALE = saved_scale
     
-    add_terminal_message(f"Skin range updated: H:{min_h}-{max_h}, S:{min_s}-{max_s}, V:{min_v}-{max_v}")
\ No newline at end of file
+    min_size, max_size = get_hand_size_limits(frames[0].shape[1])
+    print(f"Cascade at each detection scale on {len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]} "
+          f"(hand size {min_size}-{max_size or 'any'}px, mean of {repeats} runs)")
+    print(f"{'scale':>6} {'per frame':>10} {'speedup':>8} {'hands':>6} {'recall':>7} {'precision':>10} {'mean IoU':>9}")
+    reference_time, reference = results[1.0]
+    reference_count = sum(len(hands) for hands in reference)
+    for scale in sorted(results, reverse=True):
+        seconds, found = results[scale]
+        found_count = sum(len(hands) for hands in found)
+        matches, total_overlap = 0, 0.0
+        for expected, hands in zip(reference, found):
+            frame_matches, frame_overlap = _match_hands(expected, hands)
+            matches += frame_matches
+            total_overlap += frame_overlap
+        recall = f"{100.0 * matches / reference_count:.0f}%" if reference_count else "-"
+        precision = f"{100.0 * matches / found_count:.0f}%" if found_count else "-"
+        mean_overlap = f"{total_overlap / matches:.2f}" if matches else "-"
+        print(f"{scale:>6} {seconds * 1000:>8.2f}ms {reference_time / seconds:>7.1f}x {found_count:>6} "
+              f"{recall:>7} {precision:>10} {mean_overlap:>9}")
+        
+        # The cascade window is 24px, so a low scale can't see the smallest configured hands
+        if scale < 1.0 and min_size and 24 / scale > min_size:
+            print(f"{'':>6} (smallest hand found at this scale is about {int(24 / scale)}px)")
+    return results
+
+def _read_corpus(source, path, max_frames):
+    """Read up to max_frames frames of a recorded source into memory"""
+    import frame_sources
+    frame_source = frame_sources.create_frame_source(source, path, pacing="fast")
+    frame_source.loop = False
+    frames = []
+    try:
+        while len(frames) < max_frames:
+            ret, frame = frame_source.read()
+            if not ret:
+                if getattr(frame_source, "finished", False):
+                    break
+                continue
+            frames.append(frame.copy())
+    finally:
+        frame_source.release()
+    return frames
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hand detection tools")
+    parser.add_argument("--benchmark", action="store_true", help="Time fingertip extraction on jagged contours")
+    parser.add_argument("--spikes", type=int, nargs="+", default=[50, 200, 500], help="Spikes per test contour")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--allocations", action="store_true",
+                        help="Measure memory allocated per frame with fresh vs reused detector buffers")
+    parser.add_argument("--scale-report", action="store_true",
+                        help="Compare cascade speed and accuracy at each detection scale on a recorded corpus")
+    parser.add_argument("--source", choices=["video", "images", "synthetic"], default="synthetic")
+    parser.add_argument("--path", help="Video file or image directory for the scale report")
+    parser.add_argument("--frames", type=int, default=100, help="Frames of the corpus to use")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.5, 0.25])
+    args = parser.parse_args()
+
+    if args.scale_report:
+        if args.source != "synthetic" and not args.path:
+            print(f"--path is required for the {args.source} source")
+            sys.exit(1)
+        frames = _read_corpus(args.source, args.path, args.frames)
+        if not frames:
+            print("No frames read from the corpus")
+            sys.exit(1)
+        run_scale_report(frames, args.scales)
+    elif args.allocations:
+        run_allocation_benchmark(args.frames)
+    elif args.benchmark:
+        run_benchmark(args.spikes, args.repeats)
+    else:
+        parser.print_help()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# hand_tracker.py - Follows detected hands between cascade runs
+#
+# The Haar cascade is the most expensive part of detection. In tracking mode
+# it only runs every few frames (or when a track is lost); in between, each
+# hand box is moved with CamShift on the skin mask of a small search window
+# around it, which costs a fraction of a cascade run. When the cascade does
+# run, its boxes are matched to the existing tracks by overlap: matches keep
+# their track, new boxes start tracks, and tracks the cascade missed survive
+# a limited number of cascade runs while they still cover skin.
+
+import cv2
+import config
+import hand_detection
+
+class Track:
+    """One hand box being followed"""
+    def __init__(self, track_id, rect):
+        self.track_id = track_id
+        self.rect = rect  # (x, y, w, h) in frame coordinates
+        self.offset = (0, 0)  # Box centre minus skin blob centre, so the box keeps its place on the hand
+        self.misses = 0  # Consecutive cascade runs that did not find this hand
+        self.age = 0  # Frames tracked since the last cascade match
+
+class HandTracker:
+    """Propagates hand boxes with CamShift and reconciles them with cascade detections"""
+    def __init__(self, detector=None):
+        self.detector = detector or hand_detection.default_detector  # Supplies the skin range
+        self.tracks = []
+        self.next_id = 0
+        self.criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 1)
+
+        # Statistics
+        self.frames_tracked = 0
+        self.tracks_lost = 0
+
+    def reconcile(self, frame, detections):
+        """Merge a cascade result into the tracks and return the hand rects to use"""
+        bounds = (0, 0, frame.shape[1], frame.shape[0])
+        unmatched = list(self.tracks)
+        tracks = []
+        for rect in detections:
+            best = max(unmatched, key=lambda track: hand_detection.rect_overlap(track.rect, rect), default=None)
+            if best is not None and hand_detection.rect_overlap(best.rect, rect) >= config.TRACK_MATCH_OVERLAP:
+                unmatched.remove(best)
+                best.rect, best.misses, best.age = tuple(rect), 0, 0
+                tracks.append(best)
+            else:
+                tracks.append(Track(self.next_id, tuple(rect)))
+                self.next_id += 1
+
+        # The cascade misses hands now and then - keep a track that still covers skin for a while
+        for track in unmatched:
+            track.misses += 1
+            if track.misses <= config.TRACK_MAX_MISSES and self._skin_fill(frame, track.rect) >= config.TRACK_MIN_FILL:
+                tracks.append(track)
+            else:
+                self.tracks_lost += 1
+        for track in tracks:
+            blob = self._find_blob(frame, track.rect, bounds)
+            if blob is not None:
+                x, y, w, h = track.rect
+                track.offset = (x + w // 2 - (blob[0] + blob[2] // 2), y + h // 2 - (blob[1] + blob[3] // 2))
+        self.tracks = tracks
+        return [track.rect for track in tracks]
+
+    def track(self, frame, region=None):
+        """Move every track to the current frame, returning the hand rects or None if one was lost"""
+        if not self.tracks:
+            return None
+
+        height, width = frame.shape[:2]
+        if region is not None:
+            bounds = (region[0], region[1], region[0] + region[2], region[1] + region[3])
+        else:
+            bounds = (0, 0, width, height)
+
+        for track in self.tracks:
+            blob = self._find_blob(frame, track.rect, bounds)
+            if blob is None:
+                self.tracks_lost += 1
+                self.tracks = []
+                return None
+            
+            # Move the box with the skin blob, keeping the cascade's size
+            x, y, w, h = track.rect
+            cx, cy = blob[0] + blob[2] // 2 + track.offset[0], blob[1] + blob[3] // 2 + track.offset[1]
+            track.rect = (max(0, min(int(cx - w // 2), width - w)), max(0, min(int(cy - h // 2), height - h)), w, h)
+            track.age += 1
+
+        self.frames_tracked += 1
+        return [track.rect for track in self.tracks]
+
+    def reset(self):
+        """Drop every track (the next frame runs the cascade)"""
+        self.tracks = []
+
+    def _find_blob(self, frame, rect, bounds):
+        """Run CamShift around a box and return the skin blob window in frame coordinates, or None if lost"""
+        x, y, w, h = rect
+        # Search a window around the last box, large enough for a fast hand
+        pad_x, pad_y = w // 2, h // 2
+        left, top = max(bounds[0], x - pad_x), max(bounds[1], y - pad_y)
+        right, bottom = min(bounds[2], x + w + pad_x), min(bounds[3], y + h + pad_y)
+        if right - left < 2 or bottom - top < 2:
+            return None
+        
+        mask = self._skin_mask(frame[top:bottom, left:right])
+        window = (max(0, x - left), max(0, y - top), max(1, min(w, right - left)), max(1, min(h, bottom - top)))
+        _, (wx, wy, ww, wh) = cv2.CamShift(mask, window, self.criteria)
+        
+        # A collapsed window or one with little skin left means the hand is gone
+        if ww * wh < config.TRACK_MIN_AREA or \
+                cv2.countNonZero(mask[wy:wy+wh, wx:wx+ww]) < config.TRACK_MIN_FILL * ww * wh:
+            return None
+        return left + wx, top + wy, ww, wh
+
+    def _skin_mask(self, image):
+        """Skin mask of an image with the calibrated range"""
+        hsv = cv2.cvtColor(image, hand_detection.get_color_conversion("hsv"))
+        return cv2.inRange(hsv, self.detector.lower_skin, self.detector.upper_skin)
+
+    def _skin_fill(self, frame, rect):
+        """Fraction of a rect covered by skin"""
+        x, y, w, h = rect
+        height, width = frame.shape[:2]
+        image = frame[max(0, y):min(height, y + h), max(0, x):min(width, x + w)]
+        if image.size == 0:
+            return 0.0
+        return cv2.countNonZero(self._skin_mask(image)) / float(image.shape[0] * image.shape[1])
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# latency_probe.py - Finds the smallest stable audio buffer for this machine
+#
+# Streams blocks through the mixer at each buffer size, counts underruns and
+# measures how evenly the output asks for new blocks (callback jitter), then
+# writes the smallest stable setting to the audio profile read at startup.
+#
+# Run with:  python latency_probe.py            (real audio device)
+#            python latency_probe.py --null-sink (no device, e.g. on a server)
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import numpy as np
+import pygame
+import config
+
+DEFAULT_BUFFER_SIZES = [128, 256, 512, 1024, 2048]
+
+def probe_buffer_size(buffer_size, duration):
+    """Stream silent blocks at one buffer size and return its timing stats"""
+    pygame.mixer.quit()
+    pygame.mixer.init(frequency=config.MIXER_FREQUENCY, size=config.MIXER_SIZE,
+                      channels=config.MIXER_CHANNELS, buffer=buffer_size)
+    frequency, _, channels = pygame.mixer.get_init()
+
+    # One block per output buffer, as the mixer engine does
+    block = pygame.mixer.Sound(buffer=np.zeros((buffer_size, channels), dtype=np.int16))
+    block_time = buffer_size / frequency
+    channel = pygame.mixer.Channel(0)
+
+    channel.play(block)
+    channel.queue(block)
+
+    underruns = 0
+    refill_times = []
+    end_time = time.perf_counter() + duration
+
+    while time.perf_counter() < end_time:
+        if not channel.get_busy():
+            # The output ran dry before we queued the next block
+            underruns += 1
+            channel.play(block)
+            channel.queue(block)
+        elif channel.get_queue() is None:
+            refill_times.append(time.perf_counter())
+            channel.queue(block)
+        time.sleep(block_time / 8)
+
+    channel.stop()
+
+    intervals = np.diff(refill_times) * 1000 if len(refill_times) > 1 else np.zeros(1)
+    jitter = np.abs(intervals - block_time * 1000)
+    return {
+        "buffer": buffer_size,
+        "latency_ms": block_time * 1000,
+        "blocks": len(refill_times),
+        "underruns": underruns,
+        "mean_interval_ms": float(intervals.mean()),
+        "jitter_ms": float(jitter.mean()),
+        "jitter_p99_ms": float(np.percentile(jitter, 99))
+    }
+
+def is_stable(result):
+    """A buffer size is stable if it never underran and jitter stays within half a block"""
+    return result["underruns"] == 0 and result["jitter_p99_ms"] < result["latency_ms"] * 0.5
+
+def print_report(results, chosen):
+    """Print a table of probe results so machines can be compared"""
+    print()
+    print(f"Audio latency probe - {platform.node()} ({platform.system()} {platform.machine()})")
+    print(f"Driver: {os.environ.get('SDL_AUDIODRIVER', 'default')}, {config.MIXER_FREQUENCY} Hz")
+    print(f"{'buffer':>8} {'latency':>9} {'blocks':>7} {'underruns':>10} {'interval':>10} {'jitter':>8} {'p99':>8}  stable")
+    for result in results:
+        print(f"{result['buffer']:>8} {result['latency_ms']:>7.1f}ms {result['blocks']:>7} {result['underruns']:>10} "
+              f"{result['mean_interval_ms']:>8.2f}ms {result['jitter_ms']:>6.2f}ms {result['jitter_p99_ms']:>6.2f}ms  "
+              f"{'yes' if is_stable(result) else 'no'}")
+    if chosen is not None:
+        print(f"Chosen buffer: {chosen['buffer']} frames ({chosen['latency_ms']:.1f} ms)")
+    else:
+        print("No stable buffer size found")
+
+def save_profile(chosen, results, profile_file=config.AUDIO_PROFILE_FILE):
+    """Write the chosen buffer size to the audio profile read by config.initialize_pygame"""
+    profile = {
+        "buffer": chosen["buffer"],
+        "block_size": chosen["buffer"],
+        "frequency": config.MIXER_FREQUENCY,
+        "machine": platform.node(),
+        "driver": os.environ.get("SDL_AUDIODRIVER", "default"),
+        "measured": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results
+    }
+    with open(profile_file, 'w') as f:
+        json.dump(profile, f, indent=1)
+    print(f"Saved audio profile to {profile_file}")
+
+def run_probe(buffer_sizes=DEFAULT_BUFFER_SIZES, duration=3.0):
+    """Probe each buffer size from smallest to largest and return (results, chosen)"""
+    results = []
+    for buffer_size in sorted(buffer_sizes):
+        print(f"Probing buffer size {buffer_size}...")
+        results.append(probe_buffer_size(buffer_size, duration))
+
+    stable = [result for result in results if is_stable(result)]
+    chosen = stable[0] if stable else None
+    return results, chosen
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure audio buffer stability and save an audio profile")
+    parser.add_argument("--buffers", type=int, nargs="+", default=DEFAULT_BUFFER_SIZES, help="Buffer sizes to try")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds to stream at each size")
+    parser.add_argument("--null-sink", action="store_true", help="Use SDL's dummy audio driver instead of a device")
+    parser.add_argument("--no-save", action="store_true", help="Only print the report")
+    args = parser.parse_args()
+
+    if args.null_sink:
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+    results, chosen = run_probe(args.buffers, args.duration)
+    print_report(results, chosen)
+
+    if chosen is None:
+        sys.exit(1)
+    if not args.no_save:
+        save_profile(chosen, results)
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# midi_player.py - Plays Standard MIDI Files through the piano's audio engine
+#
+# The file is parsed up front into a flat list of note events in seconds
+# (tempo changes and the sustain pedal already applied). A scheduler thread
+# hands notes to the engine slightly ahead of time: the numpy engine gets the
+# exact output frame of each note, so playback is sample-accurate even in
+# dense passages; the pygame engine is driven from a perf_counter clock and the
+# difference between the planned and the actual trigger time is reported as
+# drift. Both go through piano.play_note, so this doubles as a load generator.
+#
+# Play with:      python midi_player.py song.mid
+# Load test with: python midi_player.py --generate burst.mid --notes-per-second 1000
+
+import os
+import sys
+import time
+import struct
+import argparse
+import threading
+import config
+
+DEFAULT_TEMPO = 500000  # Microseconds per quarter note (120 BPM)
+
+class MidiFileError(ValueError):
+    """Raised when a file is not a valid Standard MIDI File"""
+
+def _read_varlen(data, pos):
+    """Read a variable-length quantity and return (value, new position)"""
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, pos
+
+def _parse_track(data, track_number):
+    """Return (tick, order, kind, channel, a, b) events from one MTrk chunk"""
+    events = []
+    pos = 0
+    tick = 0
+    status = None
+
+    while pos < len(data):
+        delta, pos = _read_varlen(data, pos)
+        tick += delta
+
+        if data[pos] & 0x80:
+            status = data[pos]
+            pos += 1
+        elif status is None:
+            raise MidiFileError(f"Running status without a status byte in track {track_number}")
+
+        if status == 0xFF:
+            # Meta event - only tempo changes matter for playback
+            meta_type = data[pos]
+            length, pos = _read_varlen(data, pos + 1)
+            if meta_type == 0x51 and length == 3:
+                tempo = (data[pos] << 16) | (data[pos + 1] << 8) | data[pos + 2]
+                events.append((tick, 0, "tempo", 0, tempo, 0))
+            elif meta_type == 0x2F:
+                break  # End of track
+            pos += length
+            status = None
+        elif status in (0xF0, 0xF7):
+            # SysEx - skip the payload
+            length, pos = _read_varlen(data, pos)
+            pos += length
+            status = None
+        else:
+            kind = status & 0xF0
+            channel = status & 0x0F
+            if kind in (0xC0, 0xD0):
+                pos += 1  # Program change / channel pressure have one data byte
+                continue
+            a, b = data[pos], data[pos + 1]
+            pos += 2
+
+            if kind == 0x90 and b > 0:
+                events.append((tick, 2, "on", channel, a, b))
+            elif kind == 0x80 or kind == 0x90:
+                events.append((tick, 1, "off", channel, a, 0))
+            elif kind == 0xB0 and a == 64:
+                events.append((tick, 1, "sustain", channel, b >= 64, 0))
+    return events
+
+def parse_midi_file(midi_file):
+    """Parse a .mid file into a time-sorted list of (seconds, "on"/"off", MIDI note, velocity)"""
+    with open(midi_file, 'rb') as f:
+        data = f.read()
+
+    if data[:4] != b'MThd':
+        raise MidiFileError(f"{midi_file} is not a MIDI file")
+    header_length = struct.unpack('>I', data[4:8])[0]
+    _, num_tracks, division = struct.unpack('>HHH', data[8:14])
+
+    raw_events = []
+    pos = 8 + header_length
+    for track_number in range(num_tracks):
+        if data[pos:pos + 4] != b'MTrk':
+            raise MidiFileError(f"Missing track chunk {track_number} in {midi_file}")
+        length = struct.unpack('>I', data[pos + 4:pos + 8])[0]
+        try:
+            raw_events.extend(_parse_track(data[pos + 8:pos + 8 + length], track_number))
+        except IndexError:
+            raise MidiFileError(f"Track {track_number} in {midi_file} is truncated")
+        pos += 8 + length
+
+    # Tempo events sort before notes on the same tick, note-offs before note-ons
+    raw_events.sort(key=lambda event: (event[0], event[1]))
+
+    if division & 0x8000:
+        # SMPTE timing: fixed ticks per second, tempo changes do not apply
+        frames_per_second = 256 - (division >> 8)
+        seconds_per_tick = 1.0 / (frames_per_second * (division & 0xFF))
+        tempo_scale = None
+    else:
+        tempo_scale = 1.0 / (division * 1000000)
+        seconds_per_tick = DEFAULT_TEMPO * tempo_scale
+
+    events = []
+    last_tick = 0
+    seconds = 0.0
+    sustain = [False] * 16
+    sustained = [set() for _ in range(16)]  # Notes released while the pedal was down
+
+    for tick, _, kind, channel, a, b in raw_events:
+        seconds += (tick - last_tick) * seconds_per_tick
+        last_tick = tick
+
+        if kind == "tempo":
+            if tempo_scale is not None:
+                seconds_per_tick = a * tempo_scale
+        elif kind == "on":
+            sustained[channel].discard(a)
+            events.append((seconds, "on", a, b))
+        elif kind == "off":
+            if sustain[channel]:
+                sustained[channel].add(a)
+            else:
+                events.append((seconds, "off", a, 0))
+        elif kind == "sustain":
+            sustain[channel] = a
+            if not a:
+                events.extend((seconds, "off", note, 0) for note in sorted(sustained[channel]))
+                sustained[channel].clear()
+    return events
+
+def write_midi_file(midi_file, notes, ticks_per_quarter=480, tempo=DEFAULT_TEMPO):
+    """Write (start seconds, duration seconds, MIDI note, velocity) notes as a format 0 file"""
+    ticks_per_second = ticks_per_quarter * 1000000 / tempo
+    timed = []
+    for start, duration, note, velocity in notes:
+        timed.append((int(round(start * ticks_per_second)), 1, 0x90, note, velocity))
+        timed.append((int(round((start + duration) * ticks_per_second)), 0, 0x80, note, 0))
+    timed.sort()
+
+    track = bytearray(b'\x00\xFF\x51\x03' + tempo.to_bytes(3, 'big'))
+    last_tick = 0
+    for tick, _, status, note, velocity in timed:
+        delta = tick - last_tick
+        last_tick = tick
+        varlen = [delta & 0x7F]
+        while delta > 0x7F:
+            delta >>= 7
+            varlen.insert(0, (delta & 0x7F) | 0x80)
+        track += bytes(varlen) + bytes([status, note, velocity])
+    track += b'\x00\xFF\x2F\x00'
+
+    with open(midi_file, 'wb') as f:
+        f.write(b'MThd' + struct.pack('>IHHH', 6, 0, 1, ticks_per_quarter))
+        f.write(b'MTrk' + struct.pack('>I', len(track)) + track)
+
+def generate_burst_notes(notes_per_second, seconds, duration=0.05, seed=0):
+    """Random notes across the keyboard at a fixed rate, for load testing"""
+    import random
+    rng = random.Random(seed)
+    count = int(notes_per_second * seconds)
+    return [(i / notes_per_second, duration, rng.randrange(config.START_NOTE, config.START_NOTE + config.NUM_KEYS),
+             rng.randrange(40, 128)) for i in range(count)]
+
+class MidiPlayer:
+    """Schedules parsed MIDI events onto the piano in a background thread"""
+    def __init__(self, events, speed=None, lookahead_ms=None):
+        self.events = events
+        self.speed = speed or config.MIDI_SPEED
+        self.lookahead = (lookahead_ms if lookahead_ms is not None else config.MIDI_LOOKAHEAD_MS) / 1000
+
+        self.thread = None
+        self.running = False
+
+        # Statistics
+        self.notes_played = 0
+        self.notes_skipped = 0  # Outside the 88 keys
+        self.drift = []  # Seconds late (negative = early) for each note-on
+        self.start_time = None
+        self.end_time = None
+
+    def start(self):
+        """Start playback"""
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop playback"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+    def is_playing(self):
+        """Check if the player is still scheduling notes"""
+        return self.thread is not None and self.thread.is_alive()
+
+    def _run(self):
+        """Walk the event list, handing each event to the engine on time"""
+        import piano
+
+        engine = None
+        if config.AUDIO_ENGINE == "numpy":
+            import mixer_engine
+            engine = mixer_engine.engine or mixer_engine.start_engine()
+
+        self.start_time = time.perf_counter()
+        if engine is not None:
+            # Frame clock: everything is placed relative to the engine's output frames
+            lookahead_frames = int(self.lookahead * engine.frequency)
+            base_frame = engine.frames_rendered + lookahead_frames
+            poll_interval = engine.block_size / engine.frequency / 2
+
+        for seconds, kind, note, velocity in self.events:
+            if not self.running:
+                break
+
+            key = piano.get_key_for_midi(note)
+            if key is None:
+                if kind == "on":
+                    self.notes_skipped += 1
+                continue
+            note_idx, is_black = key
+            target = seconds / self.speed
+
+            if engine is not None:
+                at_frame = base_frame + int(round(target * engine.frequency))
+                while self.running and engine.frames_rendered + lookahead_frames < at_frame:
+                    time.sleep(poll_interval)
+                if kind == "on":
+                    # How far ahead of its block the note was queued (negative = too late)
+                    self.drift.append((engine.frames_rendered - at_frame) / engine.frequency)
+            else:
+                at_frame = None
+                due = self.start_time + target
+                remaining = due - time.perf_counter()
+                if remaining > 0.002:
+                    time.sleep(remaining - 0.002)
+                while time.perf_counter() < due:
+                    time.sleep(0)  # Yield the GIL rather than burn a core on the last ~2 ms
+                if kind == "on":
+                    self.drift.append(time.perf_counter() - due)
+
+            if kind == "on":
+                piano.play_note(note_idx, is_black, velocity / 127, at_frame)
+                self._set_key(piano, note_idx, is_black, True)
+                self.notes_played += 1
+            else:
+                piano.release_note(note_idx, is_black, at_frame)
+                self._set_key(piano, note_idx, is_black, False)
+
+        self.end_time = time.perf_counter()
+        self.running = False
+
+    def _set_key(self, piano, note_idx, is_black, active):
+        """Light or clear a key on the on-screen piano"""
+        keys = piano.active_black_keys if is_black else piano.active_white_keys
+        if note_idx < len(keys):
+            keys[note_idx] = active
+
+    def get_stats(self):
+        """Return a dict of playback and timing drift statistics"""
+        drift = sorted(self.drift)
+        elapsed = (self.end_time or time.perf_counter()) - (self.start_time or time.perf_counter())
+        stats = {
+            "notes_played": self.notes_played,
+            "notes_skipped": self.notes_skipped,
+            "elapsed": elapsed,
+            "notes_per_second": self.notes_played / elapsed if elapsed > 0 else 0.0,
+            "drift_mean_ms": sum(drift) / len(drift) * 1000 if drift else 0.0,
+            "drift_p99_ms": drift[min(len(drift) - 1, int(len(drift) * 0.99))] * 1000 if drift else 0.0,
+            "drift_max_ms": drift[-1] * 1000 if drift else 0.0
+        }
+
+        if config.AUDIO_ENGINE == "numpy":
+            import mixer_engine
+            if mixer_engine.engine is not None:
+                engine_stats = mixer_engine.engine.get_stats()
+                stats["late_notes"] = engine_stats["late_notes"]
+                stats["max_late_ms"] = engine_stats["max_late_ms"]
+        else:
+            import voice_pool
+            if voice_pool.pool is not None:
+                stats["voices_stolen"] = voice_pool.pool.steals
+                stats["notes_dropped"] = voice_pool.pool.drops
+        return stats
+
+# Global player (created by play_midi_file)
+player = None
+
+def play_midi_file(midi_file, speed=None):
+    """Parse a MIDI file and start playing it"""
+    global player
+    from terminal import add_terminal_message
+
+    stop_midi()
+    try:
+        events = parse_midi_file(midi_file)
+    except (OSError, MidiFileError) as e:
+        add_terminal_message(f"Could not load MIDI file {midi_file}: {e}")
+        return None
+
+    notes = sum(1 for event in events if event[1] == "on")
+    length = events[-1][0] if events else 0.0
+    add_terminal_message(f"Playing {os.path.basename(midi_file)}: {notes} notes, {length:.1f}s")
+    player = MidiPlayer(events, speed)
+    player.start()
+    return player
+
+def stop_midi():
+    """Stop the MIDI player if one is running"""
+    if player is not None:
+        player.stop()
+
+def print_report(stats):
+    """Print playback statistics"""
+    print(f"Played {stats['notes_played']} notes in {stats['elapsed']:.2f}s "
+          f"({stats['notes_per_second']:.0f} notes/s), {stats['notes_skipped']} outside the keyboard")
+    if config.AUDIO_ENGINE == "numpy":
+        print(f"Scheduling slack: mean {stats['drift_mean_ms']:.2f}ms, max {stats['drift_max_ms']:.2f}ms "
+              f"(late when positive)")
+        print(f"Notes mixed late: {stats.get('late_notes', 0)} (worst {stats.get('max_late_ms', 0.0):.2f}ms)")
+    else:
+        print(f"Trigger drift: mean {stats['drift_mean_ms']:.3f}ms, p99 {stats['drift_p99_ms']:.3f}ms, "
+              f"max {stats['drift_max_ms']:.3f}ms")
+        print(f"Voice pool: {stats.get('voices_stolen', 0)} voices stolen, {stats.get('notes_dropped', 0)} notes dropped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play a MIDI file through the piano engine")
+    parser.add_argument("midi_file", nargs="?", help="MIDI file to play")
+    parser.add_argument("--engine", choices=["pygame", "numpy"], default=None, help="Audio engine (default: config)")
+    parser.add_argument("--speed", type=float, default=None, help="Tempo multiplier")
+    parser.add_argument("--null-sink", action="store_true", help="Use SDL's dummy audio driver instead of a device")
+    parser.add_argument("--generate", metavar="FILE", help="Write a dense random MIDI file for load testing")
+    parser.add_argument("--notes-per-second", type=int, default=1000, help="Note rate for --generate")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Length for --generate")
+    args = parser.parse_args()
+
+    if args.generate:
+        write_midi_file(args.generate, generate_burst_notes(args.notes_per_second, args.seconds))
+        print(f"Wrote {int(args.notes_per_second * args.seconds)} notes to {args.generate}")
+        sys.exit(0)
+    if not args.midi_file:
+        parser.print_help()
+        sys.exit(1)
+
+    if args.null_sink:
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    if args.engine:
+        config.AUDIO_ENGINE = args.engine
+
+    import pygame
+    import piano
+    import mixer_engine
+    config.load_audio_profile()
+    pygame.mixer.pre_init(config.MIXER_FREQUENCY, config.MIXER_SIZE, config.MIXER_CHANNELS, config.MIXER_BUFFER)
+    pygame.mixer.init()
+    piano.initialize_piano()
+    piano.load_piano_sounds()
+
+    midi_player = play_midi_file(args.midi_file, args.speed)
+    if midi_player is None:
+        sys.exit(1)
+    try:
+        while midi_player.is_playing():
+            time.sleep(0.1)
+        time.sleep(1.0)  # Let the last notes ring
+    except KeyboardInterrupt:
+        midi_player.stop()
+
+    print_report(midi_player.get_stats())
+    mixer_engine.stop_engine()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# mixer_engine.py - NumPy software mixer for polyphonic note playback
+#
+# Instead of playing each note on its own pygame channel, active voices are
+# mixed into fixed-size blocks with NumPy and streamed through one reserved
+# mixer channel. Voice count, stealing policy and gain ramps are configurable
+# in config.py, so latency and CPU cost stay predictable as polyphony grows.
+
+import time
+import heapq
+import itertools
+import threading
+from collections import deque
+import numpy as np
+import pygame
+import config
+
+# Global engine instance (created by start_engine)
+engine = None
+
+class Voice:
+    """One playing note inside the mixer"""
+    __slots__ = ("sound_idx", "sample", "position", "delay", "gain", "target_gain", "started", "level")
+
+    def __init__(self, sound_idx, sample, gain, started, delay=0):
+        self.sound_idx = sound_idx
+        self.sample = sample
+        self.position = 0
+        self.delay = delay  # Frames of silence before the note starts
+        self.gain = 0.0  # Ramp up from silence to avoid a click
+        self.target_gain = gain
+        self.started = started
+        self.level = gain
+
+class MixerEngine:
+    """Mixes active voices into blocks and streams them to one pygame channel"""
+    def __init__(self, num_voices=None, block_size=None, steal_policy=None, ramp_ms=None, master_gain=None):
+        # Settings are read from config when the engine is created, so an
+        # audio profile loaded at startup is picked up
+        self.frequency, _, self.channels = pygame.mixer.get_init()
+        self.num_voices = num_voices or config.MIXER_VOICES
+        self.block_size = block_size or config.MIXER_BLOCK_SIZE
+        self.queue_blocks = max(1, config.MIXER_QUEUE_BLOCKS)
+        self.steal_policy = steal_policy or config.VOICE_STEAL_POLICY
+        self.master_gain = master_gain if master_gain is not None else config.MIXER_MASTER_GAIN
+        ramp_ms = ramp_ms if ramp_ms is not None else config.VOICE_RAMP_MS
+        self.ramp_step = 1.0 / max(1, int(self.frequency * ramp_ms / 1000))
+
+        self.voices = []  # Voices that are playing
+        self.fading = []  # Stolen or retriggered voices ramping down to silence
+        self.pending = deque()  # Note requests from other threads
+        self.scheduled = []  # Heap of requests timed for a later block
+        self._schedule_order = itertools.count()
+        self.samples = {}  # sound index -> int16 (frames, channels) array
+        self.note_counter = 0
+
+        # Reusable mixing buffers
+        self.mix_buffer = np.zeros((self.block_size, self.channels), dtype=np.float32)
+        self.ramp_steps = np.arange(1, self.block_size + 1, dtype=np.float32) * self.ramp_step
+
+        # Reverb/EQ on the mixed output (None when no effect is configured)
+        import effects
+        self.effects = effects.create_effects_chain(self.block_size, self.frequency, self.channels)
+
+        # Statistics
+        self.blocks_rendered = 0
+        self.frames_rendered = 0  # Frame clock used to schedule notes sample-accurately
+        self.late_notes = 0
+        self.max_late_frames = 0
+        self.voices_stolen = 0
+        self.render_time = 0.0
+        self.max_render_time = 0.0
+
+        self.channel = None
+        self.running = False
+        self.thread = None
+
+    def get_sample(self, sound_idx):
+        """Return the PCM array for a sound index, converting the pygame Sound once"""
+        if config.SAMPLE_MODE == "sparse":
+            # The sparse set keeps its own bounded cache, so do not hold every note here
+            import piano
+            import warmup
+            warmup.ensure_sparse_sounds()
+            return piano.sounds.get_array(sound_idx)
+
+        sample = self.samples.get(sound_idx)
+        if sample is None:
+            import piano
+            sound = piano.sounds.get(sound_idx)
+            if sound is None:
+                import warmup
+                sound = warmup.ensure_sound(sound_idx)
+            sample = pygame.sndarray.array(sound).reshape(-1, self.channels)
+            self.samples[sound_idx] = sample
+        return sample
+
+    def note_on(self, sound_idx, gain=1.0, at_frame=None):
+        """Queue a note to start at a frame, or at the next block (safe to call from any thread)"""
+        self.pending.append((at_frame, sound_idx, self.get_sample(sound_idx), gain))
+
+    def note_off(self, sound_idx, at_frame=None):
+        """Queue a release of a note (takes effect at the block containing at_frame)"""
+        self.pending.append((at_frame, sound_idx, None, 0.0))
+
+    def get_frame_time(self, at_frame):
+        """Estimate the perf_counter time at which a frame of the engine clock is mixed"""
+        return time.perf_counter() + (at_frame - self.frames_rendered) / self.frequency
+
+    def _start_pending(self):
+        """Turn note requests due in this block into voices, stealing voices if needed"""
+        block_start = self.frames_rendered
+        block_end = block_start + self.block_size
+
+        # Requests for later blocks wait in a heap ordered by frame
+        while self.pending:
+            at_frame, sound_idx, sample, gain = self.pending.popleft()
+            if at_frame is None:
+                at_frame = block_start
+            heapq.heappush(self.scheduled, (at_frame, next(self._schedule_order), sound_idx, sample, gain))
+
+        while self.scheduled and self.scheduled[0][0] < block_end:
+            at_frame, _, sound_idx, sample, gain = heapq.heappop(self.scheduled)
+            if at_frame < block_start:
+                # Arrived after its block was mixed - play it as soon as possible
+                self.late_notes += 1
+                self.max_late_frames = max(self.max_late_frames, block_start - at_frame)
+
+            if sample is None:
+                for voice in [voice for voice in self.voices if voice.sound_idx == sound_idx]:
+                    self._release(voice)
+                continue
+
+            # Retriggering a note fades out its previous voice
+            for voice in self.voices:
+                if voice.sound_idx == sound_idx:
+                    self._release(voice)
+                    break
+
+            if len(self.voices) >= self.num_voices:
+                if self.steal_policy == "quietest":
+                    victim = min(self.voices, key=lambda v: v.level)
+                else:
+                    victim = min(self.voices, key=lambda v: v.started)
+                self._release(victim)
+                self.voices_stolen += 1
+
+            self.note_counter += 1
+            self.voices.append(Voice(sound_idx, sample, gain, self.note_counter, max(0, at_frame - block_start)))
+
+    def _release(self, voice):
+        """Move a voice to the fading list so it ramps down instead of cutting off"""
+        self.voices.remove(voice)
+        voice.target_gain = 0.0
+        self.fading.append(voice)
+
+    def _mix_voice(self, voice, frames):
+        """Add one voice into the mix buffer and return whether it is still audible"""
+        offset = min(voice.delay, frames)
+        voice.delay -= offset
+        if offset == frames:
+            return True  # Starts in a later block
+
+        remaining = len(voice.sample) - voice.position
+        count = min(frames - offset, remaining)
+        if count <= 0:
+            return False
+
+        chunk = voice.sample[voice.position:voice.position + count]
+        voice.position += count
+
+        # Linear ramp towards the target gain, flat once the target is reached
+        delta = voice.target_gain - voice.gain
+        if delta == 0.0:
+            self.mix_buffer[offset:offset + count] += chunk * np.float32(voice.gain)
+        else:
+            gains = voice.gain + np.copysign(np.minimum(self.ramp_steps[:count], abs(delta)), delta)
+            self.mix_buffer[offset:offset + count] += chunk * gains[:, None]
+            voice.gain = float(gains[-1])
+
+        # Widen before abs: abs(-32768) does not fit in int16 and would wrap to a negative level
+        voice.level = voice.gain * float(np.abs(chunk[-1].astype(np.int32)).max()) / 32768.0
+        if voice.target_gain == 0.0 and voice.gain <= 0.0:
+            return False
+        return count == frames - offset
+
+    def render_block(self):
+        """Mix one block of all active voices and return it as int16 PCM"""
+        start_time = time.perf_counter()
+        self._start_pending()
+
+        self.mix_buffer.fill(0.0)
+        self.voices = [voice for voice in self.voices if self._mix_voice(voice, self.block_size)]
+        self.fading = [voice for voice in self.fading if self._mix_voice(voice, self.block_size)]
+
+        output = self.mix_buffer
+        if self.effects is not None:
+            output = self.effects.process(output)
+
+        output *= self.master_gain
+        np.clip(output, -32768, 32767, out=output)
+        block = output.astype(np.int16)
+
+        elapsed = time.perf_counter() - start_time
+        self.render_time += elapsed
+        self.max_render_time = max(self.max_render_time, elapsed)
+        self.blocks_rendered += 1
+        self.frames_rendered += self.block_size
+        return block
+
+    def start(self):
+        """Reserve an output channel and start the streaming thread"""
+        # Use the channel after voice_pool's range, so the two never share one
+        import voice_pool
+        index = voice_pool.pool.num_voices if voice_pool.pool is not None else config.PYGAME_VOICES
+        if pygame.mixer.get_num_channels() <= index:
+            pygame.mixer.set_num_channels(index + 1)
+        pygame.mixer.set_reserved(index + 1)
+        self.channel = pygame.mixer.Channel(index)
+        self.running = True
+        self.thread = threading.Thread(target=self._stream, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop streaming and release the output channel"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        if self.channel is not None:
+            self.channel.stop()
+
+    def _render_sound(self):
+        """Render the next queue_blocks blocks as one Sound"""
+        if self.queue_blocks == 1:
+            return pygame.mixer.Sound(buffer=self.render_block())
+        return pygame.mixer.Sound(buffer=np.concatenate([self.render_block() for _ in range(self.queue_blocks)]))
+
+    def _stream(self):
+        """Keep one Sound playing and one queued on the output channel
+
+        A channel queues a single Sound, so each one holds queue_blocks blocks:
+        the thread can then be held up (e.g. by the GIL) for that many blocks
+        before the output runs dry.
+        """
+        block_time = self.block_size / self.frequency
+        self.channel.play(self._render_sound())
+
+        while self.running:
+            if self.channel.get_queue() is None:
+                self.channel.queue(self._render_sound())
+            else:
+                time.sleep(block_time / 4)
+
+    def get_stats(self):
+        """Return a dict of engine counters"""
+        blocks = max(1, self.blocks_rendered)
+        block_time = self.block_size / self.frequency
+        return {
+            "voices": len(self.voices),
+            "fading": len(self.fading),
+            "voices_stolen": self.voices_stolen,
+            "blocks_rendered": self.blocks_rendered,
+            "late_notes": self.late_notes,
+            "max_late_ms": self.max_late_frames / self.frequency * 1000,
+            "avg_render_ms": self.render_time / blocks * 1000,
+            "max_render_ms": self.max_render_time * 1000,
+            "cpu_load": self.render_time / blocks / block_time,
+            "effects_ms": self.effects.process_time / blocks * 1000 if self.effects is not None else 0.0
+        }
+
+def start_engine():
+    """Create and start the global mixer engine"""
+    global engine
+
+    engine = MixerEngine()
+    engine.start()
+    print(f"Mixer engine started: {engine.num_voices} voices, {engine.block_size}-frame blocks")
+    return engine
+
+def stop_engine():
+    """Stop the global mixer engine"""
+    global engine
+
+    if engine is not None:
+        engine.stop()
+        engine = None
+
+def note_on(sound_idx, gain=1.0, at_frame=None):
+    """Start a note on the global mixer engine"""
+    if engine is None:
+        start_engine()
+    engine.note_on(sound_idx, gain, at_frame)
+
+def note_off(sound_idx, at_frame=None):
+    """Release a note on the global mixer engine"""
+    if engine is not None:
+        engine.note_off(sound_idx, at_frame)
+
+def get_frame_time(at_frame):
+    """Estimate when a frame of the global engine's clock is mixed (now without an engine)"""
+    if engine is None or at_frame is None:
+        return time.perf_counter()
+    return engine.get_frame_time(at_frame)
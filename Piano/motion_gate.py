@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# motion_gate.py - Skips hand detection while nothing in the detection area moves
+#
+# Each frame the overlay region (or the whole frame) is converted to a small
+# grayscale image and compared with the image from the last frame that was
+# actually detected. Only when enough pixels changed does detection run again;
+# otherwise the previous result is reused. A maximum skip count forces a fresh
+# detection now and then so lighting drift or a missed change can't freeze the
+# result for long. On an idle kiosk this removes nearly all detection work.
+
+import cv2
+import numpy as np
+import config
+import hand_detection
+
+class MotionGate:
+    """Decides per frame whether hand detection needs to run"""
+    def __init__(self, threshold=None, max_skip=None, scale=None, pixel_delta=None):
+        self.threshold = config.MOTION_GATE_THRESHOLD if threshold is None else threshold
+        self.max_skip = config.MOTION_GATE_MAX_SKIP if max_skip is None else max_skip
+        self.scale = scale or config.MOTION_GATE_SCALE
+        self.pixel_delta = config.MOTION_GATE_PIXEL_DELTA if pixel_delta is None else pixel_delta
+
+        # Small buffers, reallocated only when the region size changes
+        self.small = None
+        self.reference = None
+        self.diff = None
+        self.region = None
+
+        self.skipped_in_row = 0
+        self.last_change = 0.0  # Fraction of pixels that changed in the last check
+
+        # Statistics
+        self.frames_checked = 0
+        self.frames_skipped = 0
+
+    def _downscale(self, frame, region):
+        """Fill self.small with a downscaled grayscale copy of the region"""
+        if region is not None:
+            x, y, w, h = region
+            frame = frame[y:y+h, x:x+w]
+        height, width = frame.shape[:2]
+        size = (max(1, int(width * self.scale)), max(1, int(height * self.scale)))
+
+        if self.small is None or self.small.shape != (size[1], size[0]):
+            self.small = np.empty((size[1], size[0]), dtype=np.uint8)
+            self.diff = np.empty_like(self.small)
+            self.reference = None
+        # Downscale first so the color conversion touches only the small image
+        small_color = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(small_color, hand_detection.get_color_conversion("gray"), dst=self.small)
+
+    def needs_detection(self, frame, region=None):
+        """Return True if detection should run on this frame"""
+        self.frames_checked += 1
+        self._downscale(frame, region)
+
+        if self.reference is None or region != self.region:
+            changed = True
+            self.last_change = 1.0
+        else:
+            cv2.absdiff(self.small, self.reference, dst=self.diff)
+            self.last_change = np.count_nonzero(self.diff > self.pixel_delta) / self.diff.size
+            changed = self.last_change >= self.threshold
+
+        if changed or self.skipped_in_row >= self.max_skip:
+            # Compare future frames against the one detection actually saw
+            if self.reference is None:
+                self.reference = self.small.copy()
+            else:
+                np.copyto(self.reference, self.small)
+            self.region = region
+            self.skipped_in_row = 0
+            return True
+
+        self.skipped_in_row += 1
+        self.frames_skipped += 1
+        return False
+
+    def reset(self):
+        """Force detection on the next frame (e.g. after the skin range changed)"""
+        self.reference = None
+
+    def get_skip_percent(self):
+        """Percentage of checked frames where detection was skipped"""
+        if self.frames_checked == 0:
+            return 0.0
+        return 100.0 * self.frames_skipped / self.frames_checked
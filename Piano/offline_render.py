@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# offline_render.py - Records played sessions and renders them to WAV offline
+#
+# Every note played (mouse, keyboard overlay, fingertips or MIDI) goes through
+# play_note or release_note and the event log, with its gain and the time it
+# sounds, so a recording registered with the event log sees the whole
+# session. Rendering mixes the same samples as piano.sounds with NumPy in
+# large blocks, much faster than real time and without a display or audio
+# device.
+#
+# Render with:  python offline_render.py session.json practice.wav
+
+import os
+import sys
+import json
+import time
+import wave
+import argparse
+import numpy as np
+import config
+import sample_bank
+
+class SessionRecorder:
+    """Collects every note event logged while recording into a session"""
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.notes = []  # (timestamp, sound index, gain) appended by event_log, gain 0 = release
+
+    def get_events(self):
+        """Return the recorded notes as [seconds from start, note name, gain] session events"""
+        import piano
+        return [[round(timestamp - self.start_time, 6), piano.get_note_name(sound_idx), gain]
+                for timestamp, sound_idx, gain in list(self.notes)]
+
+    def save(self, session_file):
+        """Write the recorded events as a session file"""
+        save_session(self.get_events(), session_file)
+
+# Global recorder (created by start_recording)
+recorder = None
+
+def start_recording():
+    """Start recording every note played into a session"""
+    global recorder
+
+    import event_log
+    recorder = SessionRecorder()
+    event_log.add_recording(recorder.notes)
+    return recorder
+
+def stop_recording(session_file):
+    """Stop recording and save the session"""
+    global recorder
+
+    import event_log
+    if recorder is None:
+        return 0
+
+    event_log.remove_recording(recorder.notes)
+    recorder.save(session_file)
+    count = len(recorder.notes)
+    recorder = None
+    return count
+
+def save_session(events, session_file):
+    """Write a list of [seconds, note name, gain] events (gain 0 releases the note) to a session file"""
+    with open(session_file, 'w') as f:
+        json.dump({"version": 1, "events": events}, f)
+    print(f"Saved {len(events)} note events to {session_file}")
+
+def load_session(session_file):
+    """Read a session file and return its events sorted by time"""
+    with open(session_file, 'r') as f:
+        session = json.load(f)
+    return sorted(session["events"], key=lambda event: event[0])
+
+class SampleSource:
+    """Provides note samples as int16 arrays from the bank or, failing that, the MP3s"""
+    def __init__(self, bank_file=config.SAMPLE_BANK_FILE, index_file=config.SAMPLE_BANK_INDEX,
+                 sound_dir=config.SOUND_DIR):
+        self.bank = sample_bank.open_sample_bank(bank_file, index_file, sound_dir)
+        self.sound_dir = sound_dir
+        self.decoded = {}
+
+        if self.bank is not None:
+            self.frequency, _, self.channels = self.bank.format
+        else:
+            # Decoding needs the mixer format, but not a real audio device
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+            import pygame
+            pygame.mixer.init(frequency=config.MIXER_FREQUENCY, size=config.MIXER_SIZE,
+                              channels=config.MIXER_CHANNELS)
+            self.frequency, _, self.channels = pygame.mixer.get_init()
+
+    def get(self, note_name):
+        """Return the samples for a note, or None if there is no sample"""
+        if self.bank is not None:
+            return self.bank.get_array(note_name)
+
+        if note_name not in self.decoded:
+            import pygame
+            note_file = sample_bank.get_sample_file(self.sound_dir, note_name)
+            if note_file is None:
+                self.decoded[note_name] = None
+            else:
+                sound = pygame.mixer.Sound(note_file)
+                self.decoded[note_name] = pygame.sndarray.array(sound).reshape(-1, self.channels)
+        return self.decoded[note_name]
+
+def schedule_voices(events, source, ramp_frames):
+    """Turn session events into (start, end, sample, gain) voices in frames"""
+    voices = []
+    last_voice = {}  # note name -> index in voices of its latest voice
+
+    for seconds, note_name, gain in events:
+        start = int(round(seconds * source.frequency))
+
+        # A release or a retriggered note cuts off the previous voice, as the mixer does
+        previous = last_voice.get(note_name)
+        if previous is not None:
+            prev_start, prev_end, prev_sample, prev_gain = voices[previous]
+            if prev_end > start:
+                voices[previous] = (prev_start, min(prev_end, start + ramp_frames), prev_sample, prev_gain)
+        if gain <= 0.0:
+            last_voice.pop(note_name, None)
+            continue
+
+        sample = source.get(note_name)
+        if sample is None:
+            continue
+        last_voice[note_name] = len(voices)
+        voices.append((start, start + len(sample), sample, gain))
+    return voices
+
+def render_session(events, output_file, source=None, block_seconds=2.0, gain=None):
+    """Mix a session into a 16-bit WAV file block by block and return the render stats"""
+    source = source or SampleSource()
+    gain = config.MIXER_MASTER_GAIN if gain is None else gain
+    ramp_frames = max(1, int(source.frequency * config.VOICE_RAMP_MS / 1000))
+    release_ramp = np.linspace(1.0, 0.0, ramp_frames, dtype=np.float32)[:, None]
+
+    render_start = time.perf_counter()
+    voices = schedule_voices(events, source, ramp_frames)
+    total_frames = max((end for start, end, sample, voice_gain in voices), default=0)
+    block_frames = int(block_seconds * source.frequency)
+    mix = np.zeros((block_frames, source.channels), dtype=np.float32)
+
+    with wave.open(output_file, 'wb') as wav:
+        wav.setnchannels(source.channels)
+        wav.setsampwidth(2)
+        wav.setframerate(source.frequency)
+
+        next_voice = 0
+        active = []
+        for block_start in range(0, total_frames, block_frames):
+            block_end = min(block_start + block_frames, total_frames)
+            frames = block_end - block_start
+            mix[:frames] = 0.0
+
+            # Voices are sorted by start, so pick up everything starting in this block
+            while next_voice < len(voices) and voices[next_voice][0] < block_end:
+                active.append(voices[next_voice])
+                next_voice += 1
+
+            still_active = []
+            for start, end, sample, voice_gain in active:
+                lo = max(start, block_start)
+                hi = min(end, block_end)
+                if hi > lo:
+                    chunk = sample[lo - start:hi - start] * np.float32(voice_gain)
+                    fade_start = end - ramp_frames
+                    if end - start < len(sample) and hi > fade_start:
+                        # Fade out a cut-off voice over its last ramp_frames
+                        ramp_from = max(lo, fade_start)
+                        chunk[ramp_from - lo:] *= release_ramp[ramp_from - fade_start:hi - fade_start]
+                    mix[lo - block_start:hi - block_start] += chunk
+                if end > block_end:
+                    still_active.append((start, end, sample, voice_gain))
+            active = still_active
+
+            block = mix[:frames]
+            block *= gain
+            np.clip(block, -32768, 32767, out=block)
+            wav.writeframes(block.astype('<i2').tobytes())
+
+    elapsed = time.perf_counter() - render_start
+    duration = total_frames / source.frequency
+    return {
+        "notes": len(voices),
+        "duration": duration,
+        "render_time": elapsed,
+        "speed": duration / elapsed if elapsed > 0 else 0.0
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a recorded piano session to a WAV file")
+    parser.add_argument("session", help="Session file written by a recording")
+    parser.add_argument("output", help="WAV file to write")
+    parser.add_argument("--gain", type=float, default=None, help="Master gain (default: MIXER_MASTER_GAIN)")
+    parser.add_argument("--block-seconds", type=float, default=2.0, help="Seconds mixed per block")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.session):
+        print(f"Session file not found: {args.session}")
+        sys.exit(1)
+
+    stats = render_session(load_session(args.session), args.output,
+                           block_seconds=args.block_seconds, gain=args.gain)
+    print(f"Rendered {stats['notes']} notes ({stats['duration']:.1f}s of audio) to {args.output} "
+          f"in {stats['render_time']:.2f}s ({stats['speed']:.0f}x real time)")
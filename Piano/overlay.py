@@ -146,6 +146,23 @@ def update_piano_overlay_from_slider():
     
     calculate_piano_overlay()
 
+def get_detection_region(frame_width, frame_height):
+    """Get the overlay area in camera frame pixels as (x, y, w, h), or None when the overlay is off"""
+    if not overlay_active or line1_x is None or config.CAMERA_DISPLAY_RECT is None:
+        return None
+    
+    # The lines are in screen coordinates over the displayed camera frame
+    rect = config.CAMERA_DISPLAY_RECT
+    scale_x = frame_width / rect.width
+    scale_y = frame_height / rect.height
+    left = max(0, int((line1_x - rect.left) * scale_x))
+    right = min(frame_width, int((line2_x - rect.left) * scale_x))
+    top = max(0, int((line_y_top - rect.top) * scale_y))
+    bottom = min(frame_height, int((line_y_bottom - rect.top) * scale_y))
+    if right <= left or bottom <= top:
+        return None
+    return left, top, right - left, bottom - top
+
 def get_piano_overlay_positions():
     """Get the positions of the piano overlay"""
     return piano_overlay_left, piano_overlay_right
@@ -347,7 +364,7 @@ def draw(screen):
     
     # Draw distance information
     distance_text = f"Area: {line2_x - line1_x}px × {line_y_bottom - line_y_top}px"
-    font = pygame.font.SysFont('Arial', 14)
+    font = config.get_font('Arial', 14)
     text = font.render(distance_text, True, config.BLACK)
     screen.blit(text, (config.CAMERA_DISPLAY_RECT.centerx - text.get_width() // 2, config.CAMERA_DISPLAY_RECT.bottom + 5))
     
@@ -375,9 +392,9 @@ def draw(screen):
 def draw_status(screen, status_area):
     """Draw overlay status in the side panel"""
     # Draw current overlay settings
-    status_font = pygame.font.SysFont('Arial', 14)
+    status_font = config.get_font('Arial', 14)
     
-    title = pygame.font.SysFont('Arial', 16, bold=True)
+    title = config.get_font('Arial', 16, bold=True)
     title_text = title.render("Detection Overlay", True, config.BLACK)
     screen.blit(title_text, (status_area.centerx - title_text.get_width()//2, status_area.top + 15))
     
@@ -4,6 +4,9 @@
 import os
 import pygame
 import config
+import sample_bank
+import sparse_samples
+import event_log
 from terminal import add_terminal_message
 
 # Global piano variables
@@ -17,6 +20,7 @@ piano_left = 0
 piano_scroll = 0
 max_piano_scroll = 0
 sounds = {}
+midi_keys = {}  # MIDI note number -> (key index, is black)
 
 # Active keys tracking
 active_white_keys = []
@@ -26,6 +30,24 @@ active_black_keys = []
 piano_overlay_left = None
 piano_overlay_right = None
 
+# Import these modules only when needed to avoid circular imports
+warmup_module = None
+mixer_engine_module = None
+voice_pool_module = None
+
+def _import_modules():
+    """Import dependent modules only when needed (to avoid circular imports)"""
+    global warmup_module, mixer_engine_module, voice_pool_module
+    if warmup_module is None:
+        import warmup
+        warmup_module = warmup
+    if mixer_engine_module is None:
+        import mixer_engine
+        mixer_engine_module = mixer_engine
+    if voice_pool_module is None:
+        import voice_pool
+        voice_pool_module = voice_pool
+
 def initialize_piano():
     """Initialize piano keys and layout"""
     global white_keys, black_keys, white_key_count, white_notes, black_notes
@@ -33,6 +55,7 @@ def initialize_piano():
     global active_white_keys, active_black_keys
     
     white_keys = []
+    midi_keys.clear()
     black_keys = []
     white_key_count = 0
     white_notes = []
@@ -62,6 +85,7 @@ def initialize_piano():
             key_rect = pygame.Rect(x, config.PIANO_TOP, config.WHITE_KEY_WIDTH, config.PIANO_HEIGHT)
             white_keys.append(key_rect)
             white_notes.append(full_note_name)
+            midi_keys[midi_num] = (len(white_keys) - 1, False)
             white_key_count += 1
         else:  # Black key
             # Position black keys relative to white keys
@@ -75,6 +99,7 @@ def initialize_piano():
             key_rect = pygame.Rect(x, config.PIANO_TOP, config.BLACK_KEY_WIDTH, config.BLACK_KEY_HEIGHT)
             black_keys.append(key_rect)
             black_notes.append(full_note_name)
+            midi_keys[midi_num] = (len(black_keys) - 1, True)
     
     # Initialize active key tracking
     active_white_keys = [False] * len(white_keys)
@@ -87,85 +112,117 @@ def initialize_piano():
     add_terminal_message(f"Piano initialized with {len(white_keys)} white keys and {len(black_keys)} black keys")
 
 def load_piano_sounds():
-    """Load piano sound files from the piano-mp3 directory"""
-    global sounds
-    
-    # Initialize default sounds with empty buffers
-    for i in range(len(white_keys)):
-        sounds[i] = pygame.mixer.Sound(buffer=bytearray(4000))
-    for i in range(len(black_keys)):
-        sounds[1000 + i] = pygame.mixer.Sound(buffer=bytearray(4000))
-    
+    """Load piano sounds from the sample bank, falling back to the piano-mp3 directory"""
     try:
         # Path to piano sounds directory
-        sound_dir = "piano-mp3"
-        if not os.path.exists(sound_dir):
-            os.makedirs(sound_dir)
-            add_terminal_message(f"Created piano sounds directory: {sound_dir}")
+        sound_dir = config.SOUND_DIR
         
-        # Load sounds for white keys
-        for i, note_name in enumerate(white_notes):
-            try:
-                note_file = os.path.join(sound_dir, f"{note_name}.mp3")
-                if os.path.exists(note_file):
-                    sounds[i] = pygame.mixer.Sound(note_file)
-                    sounds[i].set_volume(0.8)  # Set volume to 80%
-                    print(f"Loaded {note_file}")
-                else:
-                    print(f"Sound file not found: {note_file}")
-                    # Fallback to empty buffer if file doesn't exist
-                    sounds[i] = pygame.mixer.Sound(buffer=bytearray(4000))
-            except Exception as e:
-                print(f"Error loading sound for {note_name}: {e}")
-                sounds[i] = pygame.mixer.Sound(buffer=bytearray(4000))
+        # Prefer the pre-decoded bank (no MP3 decoding needed)
+        bank = sample_bank.open_sample_bank()
+        if bank is None:
+            print("No sample bank found - decoding MP3 files (run sample_bank.py to speed this up)")
+            if not os.path.exists(sound_dir):
+                os.makedirs(sound_dir)
+                add_terminal_message(f"Created piano sounds directory: {sound_dir}")
         
-        # Load sounds for black keys
-        for i, note_name in enumerate(black_notes):
-            try:
-                note_file = os.path.join(sound_dir, f"{note_name}.mp3")
-                if os.path.exists(note_file):
-                    sounds[1000 + i] = pygame.mixer.Sound(note_file)
-                    sounds[1000 + i].set_volume(0.8)  # Set volume to 80%
-                    print(f"Loaded {note_file}")
-                else:
-                    print(f"Sound file not found: {note_file}")
-                    # Fallback to empty buffer if file doesn't exist
-                    sounds[1000 + i] = pygame.mixer.Sound(buffer=bytearray(4000))
-            except Exception as e:
-                print(f"Error loading sound for {note_name}: {e}")
-                sounds[1000 + i] = pygame.mixer.Sound(buffer=bytearray(4000))
+        if config.SAMPLE_MODE == "sparse":
+            return load_sparse_sounds(bank)
+        
+        # Load sounds for white keys, then black keys
+        for i in range(len(white_notes)):
+            load_note_sound(i, bank)
+        for i in range(len(black_notes)):
+            load_note_sound(1000 + i, bank)
         
-        add_terminal_message(f"Loaded piano sounds from {sound_dir}")
+        if bank is not None:
+            add_terminal_message(f"Loaded piano sounds from {config.SAMPLE_BANK_FILE}")
+        else:
+            add_terminal_message(f"Loaded piano sounds from {sound_dir}")
         return True
     except Exception as e:
         add_terminal_message(f"Error loading piano sounds: {e}")
         return False
 
-def play_note(note_idx, is_black=False):
-    """Play a note and show message in terminal"""
+def load_sparse_sounds(bank=None):
+    """Load every Nth sample and pitch-shift the other notes on demand"""
+    global sounds
+    
+    note_names = {get_sound_index(i, False): name for i, name in enumerate(white_notes)}
+    note_names.update({get_sound_index(i, True): name for i, name in enumerate(black_notes)})
+    sounds = sparse_samples.SparseSoundSet(note_names, bank)
+    
+    report = sounds.memory_report()
+    add_terminal_message(f"Sparse samples: {report['anchors']} of {len(note_names)} loaded, "
+                         f"{report['resident_bytes'] / 1048576:.1f} MB vs {report['full_bytes'] / 1048576:.1f} MB full")
+    return True
+
+def get_sound_index(note_idx, is_black=False):
+    """Get the key into the sounds table for a white or black key index"""
+    return 1000 + note_idx if is_black else note_idx
+
+def get_key_for_midi(midi_num):
+    """Get (key index, is black) for a MIDI note number, or None if it is off the keyboard"""
+    return midi_keys.get(midi_num)
+
+def get_note_name(sound_idx):
+    """Get the note name for a sounds table index"""
+    if sound_idx >= 1000:
+        return black_notes[sound_idx - 1000]
+    return white_notes[sound_idx]
+
+def load_note_sound(sound_idx, bank=None):
+    """Load the sound for one key into the sounds table"""
+    sound = _load_note_sound(get_note_name(sound_idx), bank, config.SOUND_DIR)
+    sounds[sound_idx] = sound
+    return sound
+
+def _load_note_sound(note_name, bank, sound_dir):
+    """Load the sound for one note, returning a silent buffer if it is unavailable"""
     try:
-        if is_black:
-            note_name = black_notes[note_idx]
-        else:
-            note_name = white_notes[note_idx]
-        
-        # Get the sound object
-        sound_idx = 1000 + note_idx if is_black else note_idx
-        sound = sounds[sound_idx]
-        
-        # Stop any previous playback of this note
-        sound.stop()
-        
-        # Set volume explicitly and play
-        sound.set_volume(1.0)  # Maximum volume
-        sound.play()
+        sound = None
+        if bank is not None:
+            sound = bank.make_sound(note_name)
+        if sound is None:
+            # Sharps resolve to the flat-named files (C#4 -> Db4.mp3)
+            note_file = sample_bank.get_sample_file(sound_dir, note_name)
+            if note_file is None:
+                print(f"Sound file not found for {note_name}")
+                return pygame.mixer.Sound(buffer=bytearray(4000))
+            sound = pygame.mixer.Sound(note_file)
+            print(f"Loaded {note_file}")
+        sound.set_volume(0.8)  # Set volume to 80%
+        return sound
+    except Exception as e:
+        print(f"Error loading sound for {note_name}: {e}")
+        return pygame.mixer.Sound(buffer=bytearray(4000))
+
+def play_note(note_idx, is_black=False, gain=1.0, at_frame=None):
+    """Play a note and show message in terminal (at_frame schedules it on the numpy engine)"""
+    try:
+        sound_idx = get_sound_index(note_idx, is_black)
+        timestamp = None
         
-        # Print debug info
-        debug_msg = f"Playing {note_name} (sound index {sound_idx})"
-        print(debug_msg)
+        if config.AUDIO_ENGINE == "numpy":
+            # Mixed by the software mixer (retrigger and voice limits handled there)
+            _import_modules()
+            mixer_engine_module.note_on(sound_idx, gain, at_frame)
+            if at_frame is not None:
+                timestamp = mixer_engine_module.get_frame_time(at_frame)
+        else:
+            _import_modules()
+            
+            # Get the sound object
+            sound = sounds.get(sound_idx)
+            if sound is None:
+                # Still warming up - block on just this note
+                sound = warmup_module.ensure_sound(sound_idx)
+            
+            # Play on a managed channel at the note's gain
+            # (the pool restarts this note if it is already playing)
+            voice_pool_module.play(sound_idx, sound, gain)
         
-        # Add message to terminal
-        add_terminal_message(debug_msg)
+        # Queue the event for the terminal - formatting happens off the trigger path
+        event_log.log_note(sound_idx, gain, timestamp)
         return True
     except Exception as e:
         error_msg = f"Error playing note: {e}"
@@ -173,6 +230,19 @@ def play_note(note_idx, is_black=False):
         add_terminal_message(error_msg)
         return False
 
+def release_note(note_idx, is_black=False, at_frame=None):
+    """Release a playing note (MIDI note-off)"""
+    sound_idx = get_sound_index(note_idx, is_black)
+    timestamp = None
+    _import_modules()
+    if config.AUDIO_ENGINE == "numpy":
+        mixer_engine_module.note_off(sound_idx, at_frame)
+        if at_frame is not None:
+            timestamp = mixer_engine_module.get_frame_time(at_frame)
+    else:
+        voice_pool_module.release(sound_idx)
+    event_log.log_release(sound_idx, timestamp)
+
 def draw_piano(screen):
     """Draw the piano keyboard on the screen"""
     # First draw white keys
@@ -190,7 +260,7 @@ def draw_piano(screen):
             pygame.draw.rect(screen, config.BLACK, adjusted_key, 1)
             
             # Draw note name at bottom of key
-            font = pygame.font.SysFont('Arial', 10)
+            font = config.get_font('Arial', 10)
             text = font.render(white_notes[i], True, config.BLACK)
             text_rect = text.get_rect(centerx=adjusted_key.centerx, bottom=adjusted_key.bottom - 5)
             screen.blit(text, text_rect)
@@ -243,14 +313,14 @@ def draw_piano(screen):
 
     # Draw scrolling instruction
     scroll_text = "Use left/right arrow keys or mouse wheel to scroll piano"
-    font = pygame.font.SysFont('Arial', 14)
+    font = config.get_font('Arial', 14)
     text = font.render(scroll_text, True, config.BLACK)
     screen.blit(text, (10, config.PIANO_TOP - 20))
     
     # Add keyboard instruction if keyboard mode is active
     if config.keyboard_overlay_active:
         kb_text = "Keyboard mode: Use A-S-D-F-G-H-J-K-L to play piano"
-        kb_font = pygame.font.SysFont('Arial', 14)
+        kb_font = config.get_font('Arial', 14)
         kb_render = kb_font.render(kb_text, True, config.BLUE)
         screen.blit(kb_render, (config.WIDTH - kb_render.get_width() - 10, config.PIANO_TOP - 20))
 
@@ -258,34 +328,38 @@ def check_piano_click(pos):
     """Check if a piano key was clicked and play the corresponding note"""
     # Only process if position is within piano area
     if config.PIANO_TOP <= pos[1] <= config.PIANO_TOP + config.PIANO_HEIGHT:
-        # Check black keys first (they're on top)
-        black_key_hit = False
-        for i, key in enumerate(black_keys):
-            # Adjust key position for scrolling
-            adjusted_key = key.copy()
-            adjusted_key.x -= piano_scroll
-            
-            if adjusted_key.collidepoint(pos):
-                active_black_keys[i] = True
-                play_note(i, True)
-                black_key_hit = True
-                break
-        
-        # If no black key was hit, check white keys
-        if not black_key_hit:
-            for i, key in enumerate(white_keys):
-                # Adjust key position for scrolling
-                adjusted_key = key.copy()
-                adjusted_key.x -= piano_scroll
-                
-                if adjusted_key.collidepoint(pos):
-                    active_white_keys[i] = True
-                    play_note(i, False)
-                    break
+        # Key rects are stored unscrolled
+        key = get_key_at((pos[0] + piano_scroll, pos[1]))
+        if key is not None:
+            note_idx, is_black = key
+            if is_black:
+                active_black_keys[note_idx] = True
+            else:
+                active_white_keys[note_idx] = True
+            play_note(note_idx, is_black)
         
         return True
     return False
 
+def get_key_at(pos):
+    """Get (key index, is black) of the key under an unscrolled piano position, or None"""
+    # Check black keys first (they're on top)
+    for i, key in enumerate(black_keys):
+        if key.collidepoint(pos):
+            return i, True
+    for i, key in enumerate(white_keys):
+        if key.collidepoint(pos):
+            return i, False
+    return None
+
+def get_key_span(lowest_midi, highest_midi):
+    """Get the (left, right) x positions covering a range of MIDI notes, or None if none are on the keyboard"""
+    rects = [(black_keys if is_black else white_keys)[note_idx]
+             for midi_num, (note_idx, is_black) in midi_keys.items() if lowest_midi <= midi_num <= highest_midi]
+    if not rects:
+        return None
+    return min(rect.left for rect in rects), max(rect.right for rect in rects)
+
 def reset_active_keys():
     """Reset all active piano keys"""
     global active_white_keys, active_black_keys
@@ -331,6 +405,12 @@ def get_visible_white_keys():
     
     return visible_white_keys
 
+def get_visible_black_keys():
+    """Get a list of indices for black keys that are currently visible"""
+    visible_start = piano_scroll
+    visible_end = visible_start + config.WIDTH
+    return [i for i, key in enumerate(black_keys) if key.left <= visible_end and key.right >= visible_start]
+
 def get_white_keys_in_overlay():
     """Get a list of white key indices that are within the piano overlay"""
     overlay_keys = []
@@ -367,7 +447,6 @@ def handle_keyboard_input(key_char):
         if config.piano_overlay_active and piano_overlay_left is not None and piano_overlay_right is not None:
             # Get keys within the overlay
             overlay_keys = get_white_keys_in_overlay()
-            print(f"Overlay keys: {overlay_keys}")
             
             # If we don't have any overlay keys, return
             if not overlay_keys:
@@ -425,9 +504,6 @@ def handle_keyboard_input(key_char):
         # Update active keys and play note
         active_white_keys[piano_key_index] = True
         play_note(piano_key_index, False)
-        
-        # Debug output
-        print(f"Keyboard key {key_char} mapped to piano key {piano_key_index} ({white_notes[piano_key_index]})")
         return True
     
     return False
@@ -541,7 +617,7 @@ def draw_keyboard_overlay(screen):
             mapped_keys.append((i, piano_key_index, kb_key))
     
     # Draw keyboard letters on mapped piano keys
-    font = pygame.font.SysFont('Arial', 16, bold=True)
+    font = config.get_font('Arial', 16, bold=True)
     
     for kb_index, key_index, key_char in mapped_keys:
         # Get the key rectangle
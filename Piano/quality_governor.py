@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# quality_governor.py - Trades detection quality for time to hold the frame rate
+#
+# The governor watches how long hand detection takes per frame. When the
+# average over a window exceeds the budget it steps down one quality level
+# (coarser cascade search, smaller processing resolution, fewer cascade runs);
+# when the average falls well under the budget it steps back up. The gap
+# between the two thresholds stops it flapping between neighbouring levels.
+# Every change is logged with the time that caused it.
+
+import numpy as np
+import config
+from terminal import add_terminal_message
+
+class QualityGovernor:
+    """Picks the detection quality level from recent detection times"""
+    def __init__(self, name="Detection", budget_ms=None, levels=None, start_level=None, window=None, headroom=None):
+        self.name = name
+        self.budget = (budget_ms or config.DETECTION_BUDGET_MS) / 1000.0
+        self.levels = levels or config.DETECTION_QUALITY_LEVELS
+        self.level = config.DETECTION_START_LEVEL if start_level is None else start_level
+        self.headroom = config.QUALITY_GOVERNOR_HEADROOM if headroom is None else headroom
+        self.samples = np.zeros(window or config.QUALITY_GOVERNOR_WINDOW, dtype=np.float64)
+        self.count = 0  # Samples collected since the last decision
+
+        # Statistics
+        self.level_changes = 0
+        self.overruns = 0  # Frames over budget
+
+    def get_settings(self):
+        """Return the quality settings of the current level"""
+        return self.levels[self.level]
+
+    def record(self, seconds):
+        """Add one frame's detection time and change level if a full window calls for it"""
+        if seconds > self.budget:
+            self.overruns += 1
+        self.samples[self.count] = seconds
+        self.count += 1
+        if self.count < len(self.samples):
+            return
+
+        # Judge the window as a whole: with a cascade interval only some frames run the cascade
+        average = self.samples.mean()
+        self.count = 0
+        if average > self.budget and self.level < len(self.levels) - 1:
+            self._set_level(self.level + 1, average, "over")
+        elif average < self.budget * self.headroom and self.level > 0:
+            self._set_level(self.level - 1, average, "under")
+
+    def _set_level(self, level, average, direction):
+        """Switch level and log why"""
+        self.level = level
+        self.level_changes += 1
+        settings = self.get_settings()
+        add_terminal_message(f"{self.name} quality -> level {level} ({average * 1000:.1f}ms {direction} "
+                             f"{self.budget * 1000:.0f}ms budget): scale {settings['scale']}, "
+                             f"scaleFactor {settings['scale_factor']}, minNeighbors {settings['min_neighbors']}, "
+                             f"cascade every {settings['cascade_interval']} frames")
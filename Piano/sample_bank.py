@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# sample_bank.py - Builds and loads the pre-decoded PCM sample bank
+#
+# Decoding 88 MP3 files on every launch is slow, so this module decodes them
+# once into a single packed PCM file plus a JSON index. Later launches
+# memory-map the packed file and create Sounds straight from buffer slices.
+#
+# Build the bank with:  python sample_bank.py
+
+import os
+import sys
+import json
+import mmap
+import argparse
+import numpy as np
+import pygame
+import config
+
+# Sharp names used by the key table mapped to the flat names used by the sample files
+ENHARMONIC_NAMES = {'C#': 'Db', 'D#': 'Eb', 'F#': 'Gb', 'G#': 'Ab', 'A#': 'Bb'}
+NOTE_OFFSETS = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+
+def split_note_name(note_name):
+    """Split a note name like 'C#4' into its pitch class and octave ('C#', '4')"""
+    pitch = note_name.rstrip('0123456789')
+    return pitch, note_name[len(pitch):]
+
+def resolve_sample_name(note_name):
+    """Return the sample file name (without extension) used for a note"""
+    pitch, octave = split_note_name(note_name)
+    return ENHARMONIC_NAMES.get(pitch, pitch) + octave
+
+def note_name_to_midi(note_name):
+    """Convert a note name like 'C#4' or 'Db4' to its MIDI note number"""
+    pitch, octave = split_note_name(note_name)
+    semitone = NOTE_OFFSETS[pitch[0]]
+    if pitch.endswith('#'):
+        semitone += 1
+    elif pitch.endswith('b'):
+        semitone -= 1
+    return (int(octave) + 1) * 12 + semitone
+
+def get_sample_file(sound_dir, note_name):
+    """Return the MP3 path for a note, or None if no file exists for it"""
+    for name in (note_name, resolve_sample_name(note_name)):
+        note_file = os.path.join(sound_dir, f"{name}.mp3")
+        if os.path.exists(note_file):
+            return note_file
+    return None
+
+class SampleBank:
+    """Memory-mapped bank of pre-decoded PCM samples"""
+    def __init__(self, bank_file, index_file):
+        with open(index_file, 'r') as f:
+            index = json.load(f)
+
+        fmt = index["format"]
+        self.format = (fmt["frequency"], fmt["size"], fmt["channels"])
+        self.samples = index["samples"]
+        self.aliases = index["aliases"]
+
+        # Map the whole bank read-only; pages are loaded lazily by the OS
+        self._file = open(bank_file, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+    def resolve(self, note_name):
+        """Return the name under which a note is stored, or None if missing"""
+        if note_name in self.samples:
+            return note_name
+        return self.aliases.get(note_name)
+
+    def __contains__(self, note_name):
+        return self.resolve(note_name) is not None
+
+    def get_buffer(self, note_name):
+        """Return a zero-copy view of the raw PCM for a note"""
+        name = self.resolve(note_name)
+        if name is None:
+            return None
+        offset, length = self.samples[name]
+        return self._view[offset:offset + length]
+
+    def get_array(self, note_name):
+        """Return the PCM for a note as an int16 (frames, channels) array view"""
+        buffer = self.get_buffer(note_name)
+        if buffer is None:
+            return None
+        return np.frombuffer(buffer, dtype=np.int16).reshape(-1, self.format[2])
+
+    def make_sound(self, note_name):
+        """Create a pygame Sound for a note from its PCM slice (no decoding)"""
+        buffer = self.get_buffer(note_name)
+        if buffer is None:
+            return None
+        return pygame.mixer.Sound(buffer=buffer)
+
+    def close(self):
+        """Release the memory map"""
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+def build_sample_bank(sound_dir=config.SOUND_DIR, bank_file=config.SAMPLE_BANK_FILE,
+                      index_file=config.SAMPLE_BANK_INDEX):
+    """Decode every MP3 in sound_dir into one packed PCM file and write its index"""
+    if pygame.mixer.get_init() is None:
+        pygame.mixer.init(frequency=config.MIXER_FREQUENCY, size=config.MIXER_SIZE,
+                          channels=config.MIXER_CHANNELS)
+
+    frequency, size, channels = pygame.mixer.get_init()
+    if size != -16:
+        raise ValueError(f"Sample bank requires a signed 16-bit mixer, got size {size}")
+
+    samples = {}
+    aliases = {}
+    offset = 0
+
+    with open(bank_file, 'wb') as bank:
+        for file_name in sorted(os.listdir(sound_dir)):
+            name, ext = os.path.splitext(file_name)
+            if ext.lower() != ".mp3":
+                continue
+
+            raw = pygame.mixer.Sound(os.path.join(sound_dir, file_name)).get_raw()
+            bank.write(raw)
+            samples[name] = [offset, len(raw)]
+            offset += len(raw)
+            print(f"Packed {file_name} ({len(raw)} bytes)")
+
+            # Let the sharp spelling from the key table find the flat sample
+            pitch, octave = split_note_name(name)
+            for sharp, flat in ENHARMONIC_NAMES.items():
+                if pitch == flat:
+                    aliases[sharp + octave] = name
+
+    index = {
+        "format": {"frequency": frequency, "size": size, "channels": channels},
+        "samples": samples,
+        "aliases": aliases
+    }
+    with open(index_file, 'w') as f:
+        json.dump(index, f, indent=1)
+
+    print(f"Wrote {len(samples)} samples ({offset / (1024 * 1024):.1f} MB) to {bank_file}")
+    return len(samples)
+
+def open_sample_bank(bank_file=config.SAMPLE_BANK_FILE, index_file=config.SAMPLE_BANK_INDEX,
+                     sound_dir=config.SOUND_DIR):
+    """Open the sample bank if it exists, matches the mixer and is up to date"""
+    if not os.path.exists(bank_file) or not os.path.exists(index_file):
+        return None
+
+    # A bank older than any source MP3 is stale and must be rebuilt
+    if os.path.isdir(sound_dir):
+        bank_time = os.path.getmtime(bank_file)
+        for file_name in os.listdir(sound_dir):
+            if file_name.lower().endswith(".mp3") and os.path.getmtime(os.path.join(sound_dir, file_name)) > bank_time:
+                print(f"Sample bank is older than {file_name} - rebuild it with sample_bank.py")
+                return None
+
+    try:
+        bank = SampleBank(bank_file, index_file)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not open sample bank: {e}")
+        return None
+
+    mixer_format = pygame.mixer.get_init()
+    if mixer_format is not None and tuple(mixer_format) != bank.format:
+        print(f"Sample bank format {bank.format} does not match mixer {mixer_format}")
+        bank.close()
+        return None
+
+    return bank
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the packed PCM sample bank")
+    parser.add_argument("--sound-dir", default=config.SOUND_DIR, help="Directory containing the note MP3s")
+    parser.add_argument("--bank", default=config.SAMPLE_BANK_FILE, help="Output PCM file")
+    parser.add_argument("--index", default=config.SAMPLE_BANK_INDEX, help="Output index file")
+    args = parser.parse_args()
+
+    # Decoding only needs the mixer format, not a real audio device
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    if not os.path.isdir(args.sound_dir):
+        print(f"Sound directory not found: {args.sound_dir}")
+        sys.exit(1)
+
+    build_sample_bank(args.sound_dir, args.bank, args.index)
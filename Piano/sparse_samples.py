@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# sparse_samples.py - Sparse sample set with pitch-shifted in-between notes
+#
+# Only every SPARSE_SAMPLE_STEP-th note is loaded. Other notes are rendered on
+# first use by resampling the nearest loaded note, and kept in a bounded LRU
+# cache. SparseSoundSet behaves like the piano.sounds dict, so play_note and
+# the mixer engine work the same way in both modes.
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pygame
+import config
+import sample_bank
+
+def pitch_shift(sample, semitones):
+    """Resample an int16 (frames, channels) array up or down by a number of semitones"""
+    ratio = 2.0 ** (semitones / 12.0)
+    out_frames = int((len(sample) - 1) / ratio)
+
+    # Linear interpolation between neighbouring frames, all channels at once
+    positions = np.arange(out_frames, dtype=np.float64) * ratio
+    index = positions.astype(np.int64)
+    frac = (positions - index).astype(np.float32)[:, None]
+    low = sample[index].astype(np.float32)
+    high = sample[index + 1].astype(np.float32)
+    return np.ascontiguousarray(low + (high - low) * frac, dtype=np.int16)
+
+class SparseSoundSet:
+    """Dict-like set of piano sounds built from a sparse set of loaded samples"""
+    def __init__(self, note_names, bank=None, step=None, cache_size=None, sound_dir=None):
+        self.note_names = note_names  # sound index -> note name
+        self.step = step or config.SPARSE_SAMPLE_STEP
+        self.cache_size = cache_size or config.SPARSE_CACHE_SIZE
+        self.sound_dir = sound_dir or config.SOUND_DIR
+        self.frequency, _, self.channels = pygame.mixer.get_init()
+        self.bank = bank
+
+        self.midi_notes = {idx: sample_bank.note_name_to_midi(name) for idx, name in note_names.items()}
+        self.anchors = {}  # MIDI note -> int16 (frames, channels) array
+        self.cache = OrderedDict()  # sound index -> rendered Sound
+        self.lock = threading.Lock()
+
+        # Statistics
+        self.renders = 0
+        self.cache_hits = 0
+        self.evictions = 0
+
+        self._load_anchors()
+
+    def _load_anchors(self):
+        """Load every step-th note, counted up from the lowest key"""
+        lowest = min(self.midi_notes.values())
+        for sound_idx, midi in self.midi_notes.items():
+            if (midi - lowest) % self.step != 0:
+                continue
+
+            note_name = self.note_names[sound_idx]
+            sample = self.bank.get_array(note_name) if self.bank is not None else None
+            if sample is None:
+                note_file = sample_bank.get_sample_file(self.sound_dir, note_name)
+                if note_file is None:
+                    print(f"Sound file not found for {note_name}")
+                    continue
+                sample = pygame.sndarray.array(pygame.mixer.Sound(note_file)).reshape(-1, self.channels)
+            self.anchors[midi] = sample
+
+    def _render(self, sound_idx):
+        """Create the Sound for a key from its nearest loaded sample"""
+        if not self.anchors:
+            return pygame.mixer.Sound(buffer=bytearray(4000))
+
+        midi = self.midi_notes[sound_idx]
+        anchor = min(self.anchors, key=lambda anchor_midi: abs(anchor_midi - midi))
+        if anchor == midi:
+            sample = np.ascontiguousarray(self.anchors[anchor])
+        else:
+            sample = pitch_shift(self.anchors[anchor], midi - anchor)
+        self.renders += 1
+        return pygame.mixer.Sound(buffer=sample)
+
+    def get(self, sound_idx, default=None):
+        """Return the Sound for a key, rendering and caching it on first use"""
+        if sound_idx not in self.midi_notes:
+            return default
+
+        with self.lock:
+            sound = self.cache.get(sound_idx)
+            if sound is not None:
+                self.cache.move_to_end(sound_idx)
+                self.cache_hits += 1
+                return sound
+
+            sound = self._render(sound_idx)
+            sound.set_volume(0.8)  # Same default volume as full mode
+            self.cache[sound_idx] = sound
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+            return sound
+
+    def get_array(self, sound_idx):
+        """Return the PCM of a key as an array view onto its cached Sound"""
+        return pygame.sndarray.samples(self.get(sound_idx)).reshape(-1, self.channels)
+
+    def __getitem__(self, sound_idx):
+        sound = self.get(sound_idx)
+        if sound is None:
+            raise KeyError(sound_idx)
+        return sound
+
+    def __contains__(self, sound_idx):
+        return sound_idx in self.midi_notes
+
+    def __len__(self):
+        return len(self.midi_notes)
+
+    def memory_report(self):
+        """Return resident sample memory against an estimate for full mode"""
+        anchor_bytes = sum(sample.nbytes for sample in self.anchors.values())
+        with self.lock:
+            cache_bytes = sum(int(sound.get_length() * self.frequency) * self.channels * 2
+                              for sound in self.cache.values())
+
+        # Full mode holds one sample per key; use real sizes from the bank when available
+        if self.bank is not None:
+            full_bytes = 0
+            for name in self.note_names.values():
+                sample = self.bank.get_array(name)
+                full_bytes += sample.nbytes if sample is not None else 0
+        else:
+            average = anchor_bytes / max(1, len(self.anchors))
+            full_bytes = int(average * len(self.note_names))
+
+        return {
+            "anchors": len(self.anchors),
+            "cached_notes": len(self.cache),
+            "resident_bytes": anchor_bytes + cache_bytes,
+            "full_bytes": full_bytes,
+            "renders": self.renders,
+            "cache_hits": self.cache_hits,
+            "evictions": self.evictions
+        }
@@ -13,14 +13,20 @@ class Terminal:
         self.rect = rect
         self.messages = []
         self.max_messages = max_messages
-        self.font = pygame.font.SysFont('Courier', 16)
-        self.title_font = pygame.font.SysFont('Courier', 18, bold=True)
+        self.font = config.get_font('Courier', 16)
+        self.title_font = config.get_font('Courier', 18, bold=True)
         self.scroll_offset = 0
         self.max_scroll = 0
     
     def add_message(self, message):
         """Add a message to the terminal"""
         self.messages.append(message)
+        
+        # Drop the oldest messages so the history stays bounded
+        if len(self.messages) > config.TERMINAL_HISTORY:
+            del self.messages[0]
+            self.scroll_offset = max(0, self.scroll_offset - 1)
+        
         if len(self.messages) > self.max_messages + self.scroll_offset:
             self.scroll_offset += 1
         self.max_scroll = max(0, len(self.messages) - self.max_messages)
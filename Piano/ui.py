@@ -5,7 +5,8 @@ import pygame
 import sys
 import config
 from terminal import add_terminal_message, get_terminal
-from camera import camera_surface, start_camera_thread, stop_camera
+import camera
+from camera import start_camera_thread, stop_camera, rescan_cameras
 
 # Import these modules only when needed to avoid circular imports
 piano_module = None 
@@ -59,7 +60,7 @@ def draw_ui(screen):
         pygame.draw.rect(screen, config.BLACK, button["rect"], 2)  # Border
         
         # Draw button text
-        font = pygame.font.SysFont('Arial', 16)
+        font = config.get_font('Arial', 16)
         text = font.render(button["label"], True, config.WHITE)
         text_rect = text.get_rect(center=button["rect"].center)
         screen.blit(text, text_rect)
@@ -72,36 +73,46 @@ def draw_ui(screen):
     # Draw camera frame
     pygame.draw.rect(screen, config.BLACK, config.CAMERA_DISPLAY_RECT, 2)
     
-    # Display camera feed if active
-    if config.recording and camera_surface is not None:
+    # Display camera feeds if active (each camera thread swaps its own surface,
+    # so a slow camera never holds up the others)
+    cameras = camera.cameras
+    if config.recording and cameras:
         try:
-            # Check if camera_surface is valid
-            if camera_surface.get_width() > 0 and camera_surface.get_height() > 0:
-                # Scale and display the camera feed
-                scaled_surface = pygame.transform.scale(camera_surface, 
-                                               (config.CAMERA_DISPLAY_RECT.width, config.CAMERA_DISPLAY_RECT.height))
-                screen.blit(scaled_surface, config.CAMERA_DISPLAY_RECT)
+            for instance in cameras:
+                camera_surface, tile = instance.surface, instance.tile
+                if camera_surface is not None and camera_surface.get_width() > 0 and camera_surface.get_height() > 0:
+                    # The camera thread already renders at tile size
+                    screen.blit(camera_surface, tile)
+                else:
+                    # No frame from this camera yet
+                    font = config.get_font('Arial', 20)
+                    text = font.render("Camera initializing...", True, config.BLACK)
+                    text_rect = text.get_rect(center=tile.center)
+                    screen.blit(text, text_rect)
                 
-                # Draw overlay if active
-                if overlay_module and overlay_module.is_active():
-                    overlay_module.draw(screen)
-            else:
-                # Surface exists but has invalid dimensions
-                font = pygame.font.SysFont('Arial', 20)
-                text = font.render("Camera initializing...", True, config.BLACK)
-                text_rect = text.get_rect(center=config.CAMERA_DISPLAY_RECT.center)
-                screen.blit(text, text_rect)
+                if len(cameras) > 1:
+                    # Label each tile with its own frame rate and latency
+                    fps, latency = instance.get_rates()
+                    font = config.get_font('Arial', 14)
+                    label = font.render(f"Camera {instance.camera_id}: {fps:.0f} fps, {latency:.0f}ms",
+                                        True, config.WHITE)
+                    screen.blit(label, (tile.left + 5, tile.top + 5))
+                    pygame.draw.rect(screen, config.BLACK, tile, 1)
+            
+            # Draw overlay if active
+            if overlay_module and overlay_module.is_active():
+                overlay_module.draw(screen)
                 
         except Exception as e:
             print(f"Error displaying camera: {e}")
             # Draw error text
-            font = pygame.font.SysFont('Arial', 20)
+            font = config.get_font('Arial', 20)
             text = font.render(f"Display Error: {str(e)[:30]}", True, config.RED)
             screen.blit(text, (config.CAMERA_DISPLAY_RECT.centerx - text.get_width()//2, 
                               config.CAMERA_DISPLAY_RECT.centery))
     else:
         # Draw placeholder text when camera is not active
-        font = pygame.font.SysFont('Arial', 20)
+        font = config.get_font('Arial', 20)
         if not config.recording:
             text_str = "Click 'Begin' to start recording"
         else:
@@ -120,12 +131,12 @@ def draw_ui(screen):
             pygame.draw.rect(screen, config.BLACK, status_area, 1)
             
             # Title
-            font = pygame.font.SysFont('Arial', 16, bold=True)
+            font = config.get_font('Arial', 16, bold=True)
             title = font.render("Automatic Calibration", True, config.BLACK)
             screen.blit(title, (status_area.centerx - title.get_width()//2, status_area.top + 15))
             
             # Status and instructions
-            status_font = pygame.font.SysFont('Arial', 14)
+            status_font = config.get_font('Arial', 14)
             instructions = [
                 "Place your hand in the green box",
                 "on the camera view.",
@@ -183,7 +194,7 @@ def draw_ui(screen):
             pygame.draw.rect(screen, config.BLACK, status_area, 1)
             
             # Title
-            font = pygame.font.SysFont('Arial', 16, bold=True)
+            font = config.get_font('Arial', 16, bold=True)
             title = font.render("Hand Detection Status", True, config.BLACK)
             screen.blit(title, (status_area.centerx - title.get_width()//2, status_area.top + 15))
             
@@ -192,7 +203,7 @@ def draw_ui(screen):
                 overlay_module.draw_status(screen, status_area)
             else:
                 # Tips and instructions
-                status_font = pygame.font.SysFont('Arial', 14)
+                status_font = config.get_font('Arial', 14)
                 instructions = [
                     "Tips for better detection:",
                     "- Make sure your hand is well lit",
@@ -268,7 +279,7 @@ def handle_events(screen):
                         button["active"] = True
                         if button["label"] == "Begin":
                             if not config.recording:
-                                config.recording = start_camera_thread()
+                                start_camera_thread()  # Sets config.recording, opens in the background
                             else:
                                 stop_camera()
                                 config.recording = False
@@ -290,6 +301,8 @@ def handle_events(screen):
                                 calibration_module.start_manual_calibration()
                             else:
                                 add_terminal_message("Please start camera first!")
+                        elif button["label"] == "Rescan Cameras":
+                            rescan_cameras()
                         elif button["label"] == "Quit Program":
                             add_terminal_message("Quitting program...")
                             # Show message briefly before quitting
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# voice_pool.py - Managed pygame mixer channels for note playback
+#
+# Sound.play() grabs any free channel from pygame's default 8 and silently
+# drops the note when none is free. The pool reserves a configurable number
+# of channels, plays every note on a channel it owns and steals a voice
+# (oldest or quietest) when all are busy. Counters for steals and drops help
+# size the pool for the expected load.
+
+import math
+import time
+import pygame
+import config
+from terminal import add_terminal_message
+
+# Global pool (created on first use)
+pool = None
+
+class ChannelPool:
+    """Fixed set of pygame channels with a voice stealing policy"""
+    def __init__(self, num_voices=None, steal_policy=None):
+        self.num_voices = num_voices or config.PYGAME_VOICES
+        self.steal_policy = steal_policy or config.PYGAME_STEAL_POLICY
+
+        # Reserve the channels (and the mixer engine's, which follows them) so
+        # unmanaged Sound.play() calls cannot take them
+        reserved = max(self.num_voices, config.PYGAME_VOICES + 1)
+        if pygame.mixer.get_num_channels() < reserved:
+            pygame.mixer.set_num_channels(reserved)
+        pygame.mixer.set_reserved(reserved)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.num_voices)]
+
+        # What each channel is playing
+        self.notes = [None] * self.num_voices
+        self.start_times = [0.0] * self.num_voices
+        self.gains = [0.0] * self.num_voices
+
+        # Statistics
+        self.plays = 0
+        self.retriggers = 0
+        self.steals = 0
+        self.drops = 0
+        self.peak_voices = 0
+
+    def _estimated_level(self, index, now):
+        """Estimate how loud a channel is from its gain and a piano-like decay"""
+        return self.gains[index] * math.exp(-(now - self.start_times[index]) / config.VOICE_DECAY_SECONDS)
+
+    def _choose_channel(self, sound_idx, now):
+        """Pick the channel for a new note, or None if the note must be dropped"""
+        busy = [channel.get_busy() for channel in self.channels]
+        self.peak_voices = max(self.peak_voices, sum(busy))
+
+        # Same-note retrigger restarts the note on the channel it is already using
+        for i, note in enumerate(self.notes):
+            if note == sound_idx and busy[i]:
+                self.retriggers += 1
+                return i
+
+        for i, is_busy in enumerate(busy):
+            if not is_busy:
+                return i
+
+        # Every channel is busy - steal one according to the policy
+        if self.steal_policy == "oldest":
+            victim = min(range(self.num_voices), key=lambda i: self.start_times[i])
+        elif self.steal_policy == "quietest":
+            victim = min(range(self.num_voices), key=lambda i: self._estimated_level(i, now))
+        else:
+            self.drops += 1
+            return None
+
+        self.steals += 1
+        return victim
+
+    def play(self, sound_idx, sound, gain=1.0):
+        """Play a sound on a managed channel and return the channel (None if dropped)"""
+        now = time.perf_counter()
+        index = self._choose_channel(sound_idx, now)
+        if index is None:
+            return None
+
+        channel = self.channels[index]
+        channel.set_volume(gain)
+        channel.play(sound)
+
+        self.notes[index] = sound_idx
+        self.start_times[index] = now
+        self.gains[index] = gain
+        self.plays += 1
+        return channel
+
+    def release(self, sound_idx, fade_ms=None):
+        """Fade out the channel playing a note (key released)"""
+        fade_ms = config.NOTE_RELEASE_MS if fade_ms is None else fade_ms
+        for i, note in enumerate(self.notes):
+            if note == sound_idx:
+                self.channels[i].fadeout(fade_ms)
+                self.notes[i] = None
+
+    def stop_all(self):
+        """Stop every managed channel"""
+        for channel in self.channels:
+            channel.stop()
+        self.notes = [None] * self.num_voices
+
+    def get_stats(self):
+        """Return a dict of pool counters"""
+        return {
+            "voices": self.num_voices,
+            "busy": sum(1 for channel in self.channels if channel.get_busy()),
+            "peak_voices": self.peak_voices,
+            "plays": self.plays,
+            "retriggers": self.retriggers,
+            "steals": self.steals,
+            "drops": self.drops
+        }
+
+    def format_stats(self):
+        """Return a one-line summary for the terminal"""
+        return (f"Voice pool: {self.plays} notes, peak {self.peak_voices} of {self.num_voices} voices, "
+                f"{self.retriggers} retriggers, {self.steals} stolen, {self.drops} dropped")
+
+def get_pool():
+    """Return the global channel pool, creating it on first use"""
+    global pool
+
+    if pool is None:
+        pool = ChannelPool()
+        print(f"Channel pool ready: {pool.num_voices} voices, '{pool.steal_policy}' stealing")
+    return pool
+
+def play(sound_idx, sound, gain=1.0):
+    """Play a sound on the global channel pool"""
+    return get_pool().play(sound_idx, sound, gain)
+
+def release(sound_idx, fade_ms=None):
+    """Fade out a note on the global channel pool"""
+    if pool is not None:
+        pool.release(sound_idx, fade_ms)
+
+def report_stats():
+    """Log the global pool's counters, so steals and drops show when the pool is too small"""
+    if pool is not None and pool.plays:
+        message = pool.format_stats()
+        print(message)
+        add_terminal_message(message)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# warmup.py - Loads sounds and the hand cascade in the background at startup
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import config
+import piano
+import sample_bank
+from terminal import add_terminal_message
+
+# Warm-up state
+executor = None
+bank = None
+sound_futures = {}
+cascade_future = None
+sparse_future = None  # Builds the sparse sample set in sparse mode
+warmup_start_time = None
+sounds_remaining = 0
+_remaining_lock = threading.Lock()
+
+def get_load_order():
+    """Return sound indices with the keys visible at the current scroll first"""
+    visible_white = piano.get_visible_white_keys()
+    visible_black = piano.get_visible_black_keys()
+
+    order = list(visible_white) + [1000 + i for i in visible_black]
+
+    # Then everything that is scrolled out of view
+    visible_white, visible_black = set(visible_white), set(visible_black)
+    order += [i for i in range(len(piano.white_keys)) if i not in visible_white]
+    order += [1000 + i for i in range(len(piano.black_keys)) if i not in visible_black]
+    return order
+
+def start_warmup():
+    """Start loading assets in a worker pool while the window stays responsive"""
+    global executor, bank, cascade_future, sparse_future, warmup_start_time, sounds_remaining
+
+    warmup_start_time = time.perf_counter()
+    bank = sample_bank.open_sample_bank()
+    if bank is None:
+        print("No sample bank found - decoding MP3 files (run sample_bank.py to speed this up)")
+
+    executor = ThreadPoolExecutor(max_workers=config.WARMUP_WORKERS, thread_name_prefix="warmup")
+
+    # The cascade is one long load, so start it first and let sounds fill the other workers
+    cascade_future = executor.submit(_load_cascade)
+
+    if config.SAMPLE_MODE == "sparse":
+        # Sparse mode only loads a few samples up front and renders the rest on demand
+        sparse_future = executor.submit(piano.load_sparse_sounds, bank)
+        load_order = []
+    else:
+        load_order = get_load_order()
+    sounds_remaining = len(load_order)
+    for sound_idx in load_order:
+        future = executor.submit(piano.load_note_sound, sound_idx, bank)
+        future.add_done_callback(_sound_done)
+        sound_futures[sound_idx] = future
+
+    if load_order:
+        add_terminal_message(f"Warming up {len(load_order)} sounds in the background...")
+
+def ensure_sound(sound_idx):
+    """Return the sound for a key, loading it now if warm-up has not reached it yet"""
+    if sparse_future is not None:
+        # The sparse set is built in one task - wait for it, then it renders the note
+        ensure_sparse_sounds()
+        return piano.sounds.get(sound_idx)
+    future = sound_futures.get(sound_idx)
+    if future is None or future.cancel():
+        # Not queued or not started yet - load just this note on the calling thread
+        return piano.load_note_sound(sound_idx, bank)
+    return future.result()
+
+def ensure_sparse_sounds():
+    """Wait until the sparse sample set is built (does nothing outside sparse warm-up)"""
+    if sparse_future is not None:
+        sparse_future.result()
+
+def shutdown_warmup():
+    """Stop the worker pool, dropping any work that has not started"""
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _sound_done(future):
+    """Count finished sounds and report when the whole set is loaded"""
+    global sounds_remaining
+
+    with _remaining_lock:
+        sounds_remaining -= 1
+        remaining = sounds_remaining
+
+    if remaining == 0:
+        elapsed = time.perf_counter() - warmup_start_time
+        add_terminal_message(f"Loaded {len(sound_futures)} sounds in {elapsed:.2f}s")
+
+def _load_cascade():
+    """Load a hand cascade for each configured camera before the cameras start"""
+    import hand_detection
+    hand_detection.preload_cascades(len(config.CAMERAS) if config.CAMERAS else 1)
+
+def preload_fonts():
+    """Build every font the UI uses (main thread only - pygame fonts are not thread-safe)
+
+    Called before the first frame, so no later screen (calibration, overlay)
+    stalls on a SysFont lookup the first time it is drawn.
+    """
+    for name, size, bold in config.PRELOAD_FONTS:
+        config.get_font(name, size, bold=bold)